@@ -0,0 +1,118 @@
+"""
+Standard timing cases, written in asv style:
+a class per entry point, params / param_names for the grid,
+setup builds the inputs and every time_* method is timed.
+Run them with python -m benchmarks.run
+"""
+
+import fee_simulation
+import find_fee_rate
+import multiple_market
+import treasury_payment
+from synstation import redemption
+from synstation.emission import EmissionSchedule
+
+
+def market_kwargs(period, daily_transaction):
+    return {
+        "bid": 10_000,
+        "fee_rates": [1, 5, 10, 20, 30, 50, 100],
+        "daily_transaction": daily_transaction,
+        "min_size": 1,
+        "max_size": 100,
+        "initial_price": 4_000,
+        "volatility": 0.01,
+        "block_time": 2,
+        "period": period,
+        "sigma_level": 3,
+        "rng": 0,
+    }
+
+
+class SpectralMarketSimulation:
+    params = ([1, 7, 30], [2_000, 20_000])
+    param_names = ("period", "daily_transaction")
+
+    def setup(self, period, daily_transaction):
+        self.kwargs = market_kwargs(period, daily_transaction)
+
+    def time_event_driven(self, period, daily_transaction):
+        fee_simulation.spectral_market_simulation(**self.kwargs, event_driven=True)
+
+
+class SpectralMarketSimulationBlockLoop:
+    # the per-block loop takes minutes beyond a day, so it is timed on one day only
+    params = (2_000, 20_000)
+    param_names = ("daily_transaction",)
+
+    def setup(self, daily_transaction):
+        self.kwargs = market_kwargs(1, daily_transaction)
+
+    def time_block_loop(self, daily_transaction):
+        fee_simulation.spectral_market_simulation(**self.kwargs)
+
+
+class OptimalSplit:
+    params = ([2, 4, 16, 64, 256], [True, False])
+    param_names = ("n", "is_buy")
+
+    def setup(self, n, is_buy):
+        self.amms, self.i, self.dx = multiple_market.generate_input(n, 0, 0, rng=0)
+
+    def time_find_optimal_split(self, n, is_buy):
+        multiple_market.find_optimal_split(self.amms, self.i, self.dx, is_buy)
+
+    def time_solve_optimal_split(self, n, is_buy):
+        multiple_market.solve_optimal_split(self.amms, self.i, self.dx, is_buy)
+
+
+class SwapFeeEarnings:
+    params = ([100, 1_000, 10_000], [720, 7_200])
+    param_names = ("n", "T")
+
+    # paths per chunk, so the temporaries stay ~1000 x T whatever n is
+    chunk_size = 1_000
+
+    def setup(self, n, T):
+        self.P = find_fee_rate.generate_price_paths(
+            T, n, 0.02 / 24**0.5, 1000, rng=0, chunk_size=self.chunk_size
+        )
+
+    def time_get_swap_fee_earnings(self, n, T):
+        find_fee_rate.get_swap_fee_earnings(
+            self.P, 10_000, 1, 0.005, chunk_size=self.chunk_size
+        )
+
+
+class OptimalRedeemAmount:
+    params = (0.98, 0.99, 0.994)
+    param_names = ("price",)
+
+    def setup(self, price):
+        self.PSM = redemption.PegStabilityModule(250_000, 500_000)
+
+    def time_get_optimal_redeem_amount(self, price):
+        redemption.get_optimal_redeem_amount(self.PSM, price)
+
+    def time_get_optimal_redeem_amount_ternary(self, price):
+        redemption.get_optimal_redeem_amount(self.PSM, price, "ternary")
+
+
+class TreasuryPayment:
+    params = (10, 100, 1_000)
+    param_names = ("max_N",)
+
+    def time_get_treasury_payments(self, max_N):
+        treasury_payment.get_treasury_payments(max_N, 1_000, rng=0)
+
+
+class EmissionAccrual:
+    params = (1_000_000, 10_000_000)
+    param_names = ("blocks",)
+
+    def setup(self, blocks):
+        self.schedule = EmissionSchedule(500_000_000, 180, changes=[(90, 365)])
+
+    def time_accrual(self, blocks):
+        for _, emission in self.schedule.accrual(0, blocks):
+            emission.sum()
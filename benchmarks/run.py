@@ -0,0 +1,210 @@
+"""
+Minimal runner for the asv style cases in benchmarks/benchmarks.py.
+
+python -m benchmarks.run                      # time everything, save .benchmarks/<commit>.json
+python -m benchmarks.run -b OptimalSplit      # only cases matching a regex
+python -m benchmarks.run --compare a.json b.json   # ratios between two saved runs
+"""
+
+import argparse
+import inspect
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import timeit
+
+import numpy as np
+from tabulate import tabulate
+
+from benchmarks import benchmarks
+from synstation import kernels
+
+
+def git_revision():
+    """
+    current commit and whether the work tree has uncommitted changes
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", True
+    return commit, dirty
+
+
+def param_grid(cls):
+    """
+    every combination of cls.params as a dict keyed by cls.param_names
+    """
+    names = getattr(cls, "param_names", [])
+    params = getattr(cls, "params", [])
+    if not names:
+        return [{}]
+    if len(names) == 1:
+        params = [params]
+    return [dict(zip(names, values)) for values in itertools.product(*params)]
+
+
+def collect(pattern=None):
+    """
+    (name, class, method name) of every time_* method, filtered by a regex on the name
+    """
+    cases = []
+    for cls_name, cls in inspect.getmembers(benchmarks, inspect.isclass):
+        if cls.__module__ != benchmarks.__name__:
+            continue
+        for method in sorted(m for m in dir(cls) if m.startswith("time_")):
+            name = f"{cls_name}.{method}"
+            if pattern is None or re.search(pattern, name):
+                cases.append((name, cls, method))
+    return cases
+
+
+def time_case(cls, method, params, repeat):
+    """
+    seconds per call of cls().method(**params), repeat samples.
+    each sample loops enough calls to last at least 0.2 s, slow cases are called once.
+    return None when the case raises NotImplementedError (skipped)
+    """
+    instance = cls()
+    try:
+        if hasattr(instance, "setup"):
+            instance.setup(**params)
+        function = getattr(instance, method)
+        timer = timeit.Timer(lambda: function(**params))
+        number, _ = timer.autorange()
+        samples = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    except NotImplementedError:
+        return None
+    finally:
+        if hasattr(instance, "teardown"):
+            instance.teardown(**params)
+
+    return {
+        "number": number,
+        "samples": samples,
+        "min": min(samples),
+        "median": float(np.median(samples)),
+    }
+
+
+def run(pattern=None, repeat=3, output=".benchmarks"):
+    """
+    time every matching case and save the results as JSON in output
+    return the path of the JSON file
+    """
+    commit, dirty = git_revision()
+    results = {}
+    for name, cls, method in collect(pattern):
+        results[name] = []
+        for params in param_grid(cls):
+            label = ", ".join(f"{k}={v}" for k, v in params.items())
+            print(f"{name}({label}) ...", end=" ", flush=True)
+            result = time_case(cls, method, params, repeat)
+            if result is None:
+                print("skipped")
+                continue
+            print(f"{result['min']:.4g} s")
+            results[name].append({"params": params, **result})
+
+    record = {
+        "commit": commit,
+        "dirty": dirty,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "jit": kernels.JIT,
+        "results": results,
+    }
+
+    os.makedirs(output, exist_ok=True)
+    path = os.path.join(output, f"{commit[:12]}{'-dirty' if dirty else ''}.json")
+    with open(path, "w") as f:
+        json.dump(record, f, indent=2)
+    return path
+
+
+def compare(base_path, head_path, threshold=1.1):
+    """
+    print head / base of the best time of every case both runs have,
+    marking ratios above threshold as regressions
+    return True when there is no regression
+    """
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+
+    def best_times(record):
+        return {
+            (name, json.dumps(entry["params"], sort_keys=True)): entry["min"]
+            for name, entries in record["results"].items()
+            for entry in entries
+        }
+
+    base_times, head_times = best_times(base), best_times(head)
+    rows = []
+    regressed = False
+    for key in sorted(base_times.keys() & head_times.keys()):
+        ratio = head_times[key] / base_times[key]
+        flag = ""
+        if ratio > threshold:
+            flag, regressed = "slower", True
+        elif ratio < 1 / threshold:
+            flag = "faster"
+        rows.append([*key, base_times[key], head_times[key], f"{ratio:.2f}", flag])
+
+    print(f"base: {base['commit'][:12]}  head: {head['commit'][:12]}")
+    print(
+        tabulate(
+            rows,
+            headers=["Case", "Params", "Base (s)", "Head (s)", "Ratio", ""],
+            floatfmt=".4g",
+        )
+    )
+    return not regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-b", "--bench", help="regex on Class.time_method")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="samples per case")
+    parser.add_argument("-o", "--output", default=".benchmarks", help="result folder")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASE", "HEAD"),
+        help="compare two saved runs instead of timing",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=1.1, help="ratio reported as regression"
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 0 if compare(*args.compare, args.threshold) else 1
+
+    path = run(args.bench, args.repeat, args.output)
+    print(f"saved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,198 @@
-from synstation import amm
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import repeat
+
 import numpy as np
 import tabulate
 
+from synstation import amm
+from synstation.kernels import clamp_path
+from synstation.montecarlo import RunningStats
+
+
+def arrival_index(arrival_times, num_blocks):
+    """
+    offsets of the noise trades of every block in the sorted arrival_times:
+    block i has trade_offsets[i + 1] - trade_offsets[i] trades,
+    and they are trades trade_offsets[i] ... trade_offsets[i + 1] - 1
+    returned as a list so the per-block loop can walk it with plain ints
+    """
+    trade_counts = np.bincount(arrival_times, minlength=num_blocks)
+    trade_offsets = np.concatenate([[0], np.cumsum(trade_counts)])
+    return trade_offsets.tolist()
+
+
+def advance_markets(
+    markets,  # list of BinaryMarket, state is updated in place
+    P_ext,  # fundamental value of UP token at every block
+    trade_blocks,  # sorted block index of every noise trade
+    trade_size,  # size of every noise trade
+    directions,  # uniform draw per noise trade per market, shape (trades, markets)
+    chunk_size=2**18,  # number of blocks evaluated at once
+    telemetry=None,  # TelemetryWriter recording sampled blocks
+    first_block=0,  # block index of P_ext[0] when a run is advanced segment by segment
+    finish=True,  # last segment of the run, closes telemetry
+):
+    """
+    event-driven equivalent of calling market.arbitrage(P_ext[i]) on every block
+    followed by market.noise_trade(...) on blocks with a noise trade.
+
+    in terms of Y = L * sqrt(P), arbitrage clamps Y into the fee band
+    [L * sqrt(P_ext / (1 + fee)), L * sqrt(P_ext * (1 + fee))]
+    and a noise trade shifts Y by the trade size, both clipped to [1, L].
+    the whole run is therefore a chain of clip(Y + c, A, B) maps,
+    which is evaluated in chunks by kernels.clamp_path.
+    with telemetry, every block is evaluated (see keep below)
+    and the state at the end of every sampled block is written out.
+    a run can be advanced over consecutive segments of P_ext,
+    telemetry is started on the segment with first_block 0 and closed by finish.
+    """
+    pools = [pool for market in markets for pool in (market.YesMarket, market.NoMarket)]
+    L = np.array([pool.L for pool in pools])
+    fee_bps = np.array([pool.fee_bps for pool in pools], dtype=float)
+    fee_multiplier = 1 + fee_bps / 10000
+    is_yes = np.tile([True, False], len(markets))
+    Y = np.array([pool.Y for pool in pools], dtype=float)
+    noise_moves = np.zeros(len(pools))
+    total_moves = np.zeros(len(pools))
+
+    # noise trade direction of every pool, see BinaryMarket.noise_trade
+    # +1: buy, -1: sell, 0: not traded
+    u = np.repeat(directions, 2, axis=1)
+    sign = np.select([u < 0.25, u < 0.5, u < 0.75], [1.0, -1.0, 1.0], -1.0)
+    sign *= np.where(u < 0.5, is_yes, ~is_yes)
+
+    # within a run of equal P_ext only the first block arbitrages,
+    # the pools are already inside the fee band for the rest of the run.
+    # between the turning points of those runs P_ext is monotone and arbitrage
+    # only moves pools in one direction, so a block with no noise trade
+    # on either side of it can be skipped:
+    # the next block moves the pools just as far with the same total volume
+    # the loss to arbitrageurs does depend on the skipped blocks, so telemetry keeps them
+    if telemetry is None:
+        runs = np.flatnonzero(np.diff(P_ext, prepend=np.nan) != 0)
+        turning = np.ones(len(runs), dtype=bool)
+        turning[1:-1] = np.diff(P_ext[runs[:-1]]) * np.diff(P_ext[runs[1:]]) < 0
+        keep = np.zeros(len(P_ext), dtype=bool)
+        keep[runs[turning]] = True
+        keep[trade_blocks] = True
+        keep[np.minimum(trade_blocks + 1, len(P_ext) - 1)] = True
+        P_ext = P_ext[keep]
+        trade_blocks = np.searchsorted(np.flatnonzero(keep), trade_blocks)
+    else:
+        if first_block == 0:
+            telemetry.start(fee_bps, is_yes)
+        noise_fee = np.array([pool.noise_fee for pool in pools], dtype=float)
+        arb_fee = np.array([pool.arb_fee for pool in pools], dtype=float)
+        arb_loss = telemetry.arb_loss
+
+    for start in range(0, len(P_ext), chunk_size):
+        end = min(start + chunk_size, len(P_ext))
+        first, last = np.searchsorted(trade_blocks, [start, end])
+
+        # arbitrage at every block, each noise trade right after its block
+        noise_steps = trade_blocks[first:last] - start + np.arange(last - first) + 1
+        is_noise = np.zeros(end - start + last - first, dtype=bool)
+        is_noise[noise_steps] = True
+        block = start + np.arange(len(is_noise)) - np.cumsum(is_noise)
+
+        P = np.where(is_yes, P_ext[block, None], 1 - P_ext[block, None])
+        c = np.zeros_like(P)
+        A = np.clip(L * np.sqrt(P / fee_multiplier), 1, L)
+        B = np.clip(L * np.sqrt(P * fee_multiplier), 1, L)
+
+        traded = sign[first:last] != 0
+        c[noise_steps] = sign[first:last] * trade_size[first:last, None]
+        A[noise_steps] = np.where(traded, 1, -np.inf)
+        B[noise_steps] = np.where(traded, L, np.inf)
+
+        path = clamp_path(Y, c, A, B)
+        moves = np.abs(np.diff(path, prepend=Y[None], axis=0))
+
+        if telemetry is not None:
+            # value given away at P_ext by every arbitrage step
+            X_path = L**2 / path - L
+            dX = np.diff(X_path, prepend=(L**2 / Y - L)[None], axis=0)
+            dY = np.diff(path, prepend=Y[None], axis=0)
+            loss = np.where(is_noise[:, None], 0, -(dY + P * dX))
+
+            # last step of every block, and the sampled ones among them
+            ends = np.flatnonzero(np.diff(block, append=end))
+            rows = ends[telemetry.sampled(first_block + block[ends])]
+            noise_sum = noise_moves + np.cumsum(moves * is_noise[:, None], axis=0)[rows]
+            arb_sum = total_moves + np.cumsum(moves, axis=0)[rows] - noise_sum
+            telemetry.write(
+                first_block + block[rows],
+                P_ext[block[rows]],
+                X=X_path[rows],
+                Y=path[rows],
+                price=path[rows] / (X_path[rows] + L),
+                noise_fee=noise_fee + noise_sum * fee_bps / 10000,
+                arb_fee=arb_fee + arb_sum * fee_bps / 10000,
+                arb_loss=arb_loss + np.cumsum(loss, axis=0)[rows],
+            )
+            arb_loss += loss.sum(axis=0)
+
+        noise_moves += moves[noise_steps].sum(axis=0)
+        total_moves += moves.sum(axis=0)
+        Y = path[-1]
+
+    arb_moves = total_moves - noise_moves
+    for j, pool in enumerate(pools):
+        pool.X = pool.L**2 / Y[j] - pool.L
+        pool.Y = Y[j]
+        pool.noise_fee += noise_moves[j] * pool.fee_bps / 10000
+        pool.arb_fee += arb_moves[j] * pool.fee_bps / 10000
+
+    if telemetry is not None and finish:
+        telemetry.close()
+
+
+class BlockRecorder:
+    """
+    telemetry of the per-block loop of spectral_market_simulation,
+    same records as advance_markets writes
+    """
+
+    def __init__(self, markets, telemetry):
+        self.pools = [
+            pool for market in markets for pool in (market.YesMarket, market.NoMarket)
+        ]
+        self.is_yes = np.tile([True, False], len(markets))
+        self.L = np.array([pool.L for pool in self.pools])
+        self.arb_loss = np.zeros(len(self.pools))
+        self.telemetry = telemetry
+        telemetry.start([pool.fee_bps for pool in self.pools], self.is_yes)
+
+    def state(self):
+        return (
+            np.array([pool.X for pool in self.pools]),
+            np.array([pool.Y for pool in self.pools]),
+        )
+
+    def before_arbitrage(self):
+        self.X, self.Y = self.state()
+
+    def after_arbitrage(self, P_ext):
+        X, Y = self.state()
+        P = np.where(self.is_yes, P_ext, 1 - P_ext)
+        self.arb_loss -= Y - self.Y + P * (X - self.X)
+
+    def end_block(self, block, P_ext):
+        if not self.telemetry.sampled(block):
+            return
+        X, Y = self.state()
+        self.telemetry.write(
+            block,
+            P_ext,
+            X=X,
+            Y=Y,
+            price=Y / (X + self.L),
+            noise_fee=[pool.noise_fee for pool in self.pools],
+            arb_fee=[pool.arb_fee for pool in self.pools],
+            arb_loss=self.arb_loss,
+        )
+
 
 def spectral_market_simulation(
     bid,  # initial bid for proposing new market
@@ -9,58 +200,126 @@ def spectral_market_simulation(
     daily_transaction,  # number of transaction per day. Polymarket: around 200k
     min_size,  # minimum size of trade
     max_size,  # maximum size of trade
-    initial_price,  # initial price of underlying asset
+    initial_price,  # initial price of underlying asset, None: first replayed price
     volatility,  # daily volatility
     block_time,  # seconds
     period,  # days
     sigma_level=2,  # confidence level for price range
+    event_driven=False,  # evaluate the path with advance_markets instead of per block
+    rng=None,  # seed or np.random.Generator
+    telemetry=None,  # synstation.telemetry.TelemetryWriter, one per run
+    common_random_numbers=False,  # every fee tier sees the same noise trade directions
+    antithetic=False,  # use the mirror image -W of the Brownian path
+    prices=None,  # synstation.paths.PriceSeries replayed instead of GBM
 ):
     """
     price follows GBM
     arbitrageur comes every block and try to make profit
     noise trader arrival is Poisson process,
     with size of trade is Uniform(0,100)
+    event_driven gives the same result as the per-block loop
+    (up to floating point rounding) in a fraction of the time
+    telemetry streams the pool states of sampled blocks to disk,
+    see synstation.telemetry
+    with common_random_numbers the fee tiers differ only by their fee,
+    and two runs with the same rng, one of them antithetic, form an antithetic pair
+    with prices, the first period days of a historical price series are replayed,
+    resampled to block_time and streamed segment by segment,
+    and the noise trades are drawn segment by segment
     """
+    rng = np.random.default_rng(rng)
+
     # initialize market
-    markets = [amm.BinaryMarket(bid=bid, fee_bps=fee_bps) for fee_bps in fee_rates]
+    markets = [
+        amm.BinaryMarket(bid=bid, fee_bps=fee_bps, rng=rng) for fee_bps in fee_rates
+    ]
     initial_values = [market.get_value(0.5) for market in markets]
 
-    # generate price of underlying asset
-    W = np.random.normal(
-        0, volatility * np.sqrt(block_time / 86400), int(period * 86400 / block_time)
-    ).cumsum()
-    P = initial_price * np.exp(W)
-
-    # fundamental value of UP token
-    P_ext = np.clip(
-        0.5
-        * (
-            1 + np.log(P / initial_price) / (volatility * np.sqrt(period) * sigma_level)
-        ),
-        0,
-        1,
-    )
+    # price of underlying asset, in segments of blocks
+    if prices is None:
+        # GBM, a single segment
+        W = rng.normal(
+            0,
+            volatility * np.sqrt(block_time / 86400),
+            int(period * 86400 / block_time),
+        ).cumsum()
+        if antithetic:
+            W = -W
+        segments = [initial_price * np.exp(W)]
+    else:
+        segments = prices.resample(block_time, period)
 
-    # generate poisson arrival of noise trader
     arrival_rate = daily_transaction / 86400 * block_time
-    num_trades = np.random.poisson(arrival_rate * len(P))
-    arrival_times = np.sort(np.random.randint(0, len(P), num_trades))
+    if telemetry is not None and not event_driven:
+        recorder = BlockRecorder(markets, telemetry)
+
+    first_block = 0
+    for P in segments:
+        if initial_price is None:
+            initial_price = P[0]
+
+        # fundamental value of UP token
+        P_ext = np.clip(
+            0.5
+            * (
+                1
+                + np.log(P / initial_price)
+                / (volatility * np.sqrt(period) * sigma_level)
+            ),
+            0,
+            1,
+        )
+
+        # generate poisson arrival of noise trader
+        num_trades = rng.poisson(arrival_rate * len(P))
+        arrival_times = np.sort(rng.integers(0, len(P), num_trades))
+
+        # generate size of trade
+        trade_size = rng.uniform(min_size, max_size, num_trades)
+
+        # direction of every noise trade on every market, drawn at once
+        if common_random_numbers:
+            directions = np.repeat(rng.random((num_trades, 1)), len(markets), axis=1)
+        else:
+            directions = rng.random((num_trades, len(markets)))
 
-    # generate size of trade
-    trade_size = np.random.uniform(min_size, max_size, num_trades)
+        # simulate markets
+        if event_driven:
+            advance_markets(
+                markets,
+                P_ext,
+                arrival_times,
+                trade_size,
+                directions,
+                telemetry=telemetry,
+                first_block=first_block,
+                finish=False,
+            )
+        else:
+            directions = directions.tolist()
+            # trades arriving at block i are trade_size[trade_offsets[i] : trade_offsets[i + 1]]
+            trade_offsets = arrival_index(arrival_times, len(P))
+            for i in range(len(P)):
+                # arbitrageur comes every block
+                if telemetry is not None:
+                    recorder.before_arbitrage()
+                for market in markets:
+                    market.arbitrage(P_ext[i])
+                if telemetry is not None:
+                    recorder.after_arbitrage(P_ext[i])
 
-    # simulate markets
-    noise_arrival = 0
-    for i in range(len(P)):
-        # arbitrageur comes every block
-        for market in markets:
-            market.arbitrage(P_ext[i])
+                # noise trader arrival follows poisson process
+                for noise_arrival in range(trade_offsets[i], trade_offsets[i + 1]):
+                    for market, rand in zip(markets, directions[noise_arrival]):
+                        market.noise_trade(trade_size[noise_arrival], rand)
 
-        # noise trader arrival follows poisson process
-        if i in arrival_times:
-            for market in markets:
-                market.noise_trade(trade_size[noise_arrival])
-            noise_arrival += 1
+                if telemetry is not None:
+                    recorder.end_block(first_block + i, P_ext[i])
+        first_block += len(P)
+
+    assert first_block, "no price to simulate"
+    if telemetry is not None:
+        telemetry.close()
 
     final_values = [market.get_value(P_ext[-1]) for market in markets]
     earned_noise_fees = [market.total_noise_fee() for market in markets]
@@ -73,12 +332,260 @@ def spectral_market_simulation(
     return pnl, earned_noise_fees, earned_arb_fees
 
 
+def _run_repetition(seed, params):
+    return spectral_market_simulation(**params, rng=np.random.default_rng(seed))
+
+
+def iter_monte_carlo(
+    repetitions,  # number of simulations
+    seed=None,  # root seed, None draws fresh entropy
+    workers=None,  # number of processes, None: all cores, 1: run in this process
+    antithetic=False,  # run repetitions as antithetic pairs (2k, 2k + 1)
+    **params,  # arguments of spectral_market_simulation
+):
+    """
+    run spectral_market_simulation `repetitions` times over a process pool
+    and yield (repetition, pnl, noise_fee, arb_fee) as soon as each one finishes.
+    repetition k always draws from the k-th child of np.random.SeedSequence(seed),
+    so every result only depends on the root seed, not on the number of workers.
+    with antithetic, repetitions 2k and 2k + 1 both draw from the k-th child,
+    the second one on the mirrored price path
+    """
+    if antithetic:
+        assert repetitions % 2 == 0, "antithetic repetitions come in pairs"
+        children = np.random.SeedSequence(seed).spawn(repetitions // 2)
+        runs = [
+            (children[k // 2], {**params, "antithetic": k % 2 == 1})
+            for k in range(repetitions)
+        ]
+    else:
+        runs = [
+            (child, params) for child in np.random.SeedSequence(seed).spawn(repetitions)
+        ]
+
+    if workers == 1:
+        for k, (child, run_params) in enumerate(runs):
+            yield k, *_run_repetition(child, run_params)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_run_repetition, child, run_params): k
+            for k, (child, run_params) in enumerate(runs)
+        }
+        for future in as_completed(futures):
+            yield futures[future], *future.result()
+
+
+def run_monte_carlo(
+    repetitions,  # number of simulations
+    seed=None,  # root seed, None draws fresh entropy
+    workers=None,  # number of processes, None: all cores, 1: run in this process
+    progress=True,  # print progress while repetitions come in
+    antithetic=False,  # run repetitions as antithetic pairs, see iter_monte_carlo
+    **params,  # arguments of spectral_market_simulation
+):
+    """
+    collect iter_monte_carlo into (repetitions, fee tiers) arrays
+    of pnl, noise fee and arb fee, ordered by repetition
+    """
+    pnls = np.zeros((repetitions, len(params["fee_rates"])))
+    noise_fees = np.zeros_like(pnls)
+    arb_fees = np.zeros_like(pnls)
+
+    results = iter_monte_carlo(repetitions, seed, workers, antithetic, **params)
+    for done, (k, pnl, noise_fee, arb_fee) in enumerate(results, start=1):
+        pnls[k], noise_fees[k], arb_fees[k] = pnl, noise_fee, arb_fee
+        if progress:
+            print(f"\rRunning simulation {done}/{repetitions} ...", end="")
+
+    return pnls, noise_fees, arb_fees
+
+
+def run_adaptive(
+    target_half_width,  # PnL confidence interval half-width to reach on every fee tier
+    seed=None,  # root seed, None draws fresh entropy
+    workers=None,  # number of processes, None: all cores, 1: run in this process
+    confidence=0.95,  # confidence level of the interval
+    time_budget=None,  # seconds, stop after the batch running when it is spent
+    min_repetitions=10,  # samples before a tier may stop
+    max_repetitions=10_000,  # samples after which a tier stops anyway
+    batch_size=16,  # repetitions run between convergence checks
+    progress=True,  # print progress after every batch
+    **params,  # arguments of spectral_market_simulation
+):
+    """
+    run spectral_market_simulation in batches, keeping running statistics per fee tier,
+    until the PnL confidence interval of every tier is narrower than target_half_width.
+    a converged tier is left out of later batches, so noisy tiers get more samples
+    without paying for the quiet ones.
+    repetitions draw from consecutive children of np.random.SeedSequence(seed),
+    so the result only depends on seed and batch_size, unless the time budget runs out.
+    return the fee rates, RunningStats of pnl, noise fee and arb fee,
+    and the tiers that converged
+    """
+    fee_rates = list(params.pop("fee_rates"))
+    stats = {
+        name: RunningStats(len(fee_rates)) for name in ("pnl", "noise_fee", "arb_fee")
+    }
+    converged = np.zeros(len(fee_rates), dtype=bool)
+    root = np.random.SeedSequence(seed)
+    start = time.perf_counter()
+
+    executor = None if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            pnl = stats["pnl"]
+            converged = pnl.converged(target_half_width, confidence, min_repetitions)
+            active = np.flatnonzero(~converged & (pnl.count < max_repetitions))
+            if not len(active):
+                break
+            if time_budget is not None and time.perf_counter() - start > time_budget:
+                break
+
+            run_params = {**params, "fee_rates": [fee_rates[j] for j in active]}
+            children = root.spawn(batch_size)
+            run = executor.map if executor is not None else map
+            for result in run(_run_repetition, children, repeat(run_params)):
+                for name, values in zip(stats, result):
+                    stats[name].update(np.asarray(values), active)
+
+            if progress:
+                print(
+                    f"\rRunning simulation {pnl.count.sum()} samples, "
+                    f"{len(active)}/{len(fee_rates)} tiers active ...",
+                    end="",
+                )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return fee_rates, stats, converged
+
+
+def adaptive_table(fee_rates, stats, converged, confidence=0.95):
+    """
+    samples needed and PnL interval of every fee tier of run_adaptive
+    """
+    headers = [
+        "Fee Rate (bps)",
+        "Samples",
+        "PnL Mean",
+        f"PnL ± ({confidence:.0%})",
+        "Noise Fee Mean",
+        "Arb Fee Mean",
+        "Converged",
+    ]
+    half_width = stats["pnl"].half_width(confidence)
+    data = []
+    for i, fee_rate in enumerate(fee_rates):
+        data.append(
+            [
+                fee_rate,
+                stats["pnl"].count[i],
+                stats["pnl"].mean[i],
+                half_width[i],
+                stats["noise_fee"].mean[i],
+                stats["arb_fee"].mean[i],
+                converged[i],
+            ]
+        )
+
+    return headers, data
+
+
+def sampling_units(x, antithetic=False):
+    """
+    independent samples of a (repetitions, fee tiers) array:
+    the repetitions themselves, or the means of the antithetic pairs
+    """
+    if antithetic:
+        return (x[0::2] + x[1::2]) / 2
+    return x
+
+
+def standard_error(x, antithetic=False):
+    """
+    standard error of the mean over repetitions for every fee tier
+    """
+    units = sampling_units(x, antithetic)
+    return np.std(units, axis=0, ddof=1) / np.sqrt(len(units))
+
+
+def summary_table(fee_rates, pnls, noise_fees, arb_fees, antithetic=False):
+    """
+    mean & std over repetitions for every fee rate,
+    with the standard error of the PnL mean.
+    with antithetic, the variance reduction of the PnL mean
+    against the same number of independent repetitions
+    """
+    headers = [
+        "Fee Rate (bps)",
+        "PnL Mean",
+        "PnL Std",
+        "PnL SE",
+        "Noise Fee Mean",
+        "Noise Fee Std",
+        "Arb Fee Mean",
+        "Arb Fee Std",
+    ]
+    pnl_se = standard_error(pnls, antithetic)
+    if antithetic:
+        headers.append("Antithetic VR")
+        iid_se = np.std(pnls, axis=0, ddof=1) / np.sqrt(len(pnls))
+        reduction = (iid_se / pnl_se) ** 2
+
+    data = []
+    for i, fee_rate in enumerate(fee_rates):
+        row = [
+            fee_rate,
+            np.mean(pnls[:, i]),
+            np.std(pnls[:, i]),
+            pnl_se[i],
+            np.mean(noise_fees[:, i]),
+            np.std(noise_fees[:, i]),
+            np.mean(arb_fees[:, i]),
+            np.std(arb_fees[:, i]),
+        ]
+        if antithetic:
+            row.append(reduction[i])
+        data.append(row)
+
+    return headers, data
+
+
+def comparison_table(fee_rates, pnls, antithetic=False, base=0, reference=None):
+    """
+    PnL of every fee rate against fee_rates[base]: mean difference and its standard error.
+    reference: PnL of a run with independent directions and no antithetic pairs,
+    any number of repetitions. when given, the variance reduction of the difference
+    per repetition is reported, i.e. how many times more repetitions the reference
+    design needs for the same confidence interval
+    """
+    headers = ["Fee Rate (bps)", f"PnL - PnL({fee_rates[base]} bps)", "SE"]
+    diffs = pnls - pnls[:, [base]]
+    diff_se = standard_error(diffs, antithetic)
+    if reference is not None:
+        headers.append("Variance Reduction")
+        reference_se = standard_error(reference - reference[:, [base]])
+        with np.errstate(invalid="ignore"):  # 0 / 0 at the base tier
+            reduction = (reference_se**2 * len(reference)) / (diff_se**2 * len(pnls))
+
+    data = []
+    for i, fee_rate in enumerate(fee_rates):
+        if i == base:
+            continue
+        row = [fee_rate, np.mean(diffs[:, i]), diff_se[i]]
+        if reference is not None:
+            row.append(reduction[i])
+        data.append(row)
+
+    return headers, data
+
+
 if __name__ == "__main__":
     # testing fee rates: 1, 5, 10, 20, 30, 50, 100 (bps)
     fee_rates = [1, 5, 10, 20, 30, 50, 100]
-    pnls_arr = []
-    earned_noise_fees_arr = []
-    earned_arb_fees_arr = []
 
     # set parameters
     _bid = 10000
@@ -90,6 +597,7 @@ if __name__ == "__main__":
     _block_time = 2
     _period = 90
     _sigma_level = 3
+    _seed = np.random.SeedSequence().entropy
 
     # print
     max_price = int(
@@ -99,48 +607,36 @@ if __name__ == "__main__":
         _initial_price / np.exp(_volatility * np.sqrt(_period) * _sigma_level)
     )
     print(f"Price Range: {min_price} - {max_price}")
+    print(f"seed: {_seed}")
 
-    # repeat 50 times
-    for i in range(50):
-        print(f"\rRunning simulation {i+1}/50 ...", end="")
-        pnls, earned_fees, earned_fees_from_arb = spectral_market_simulation(
-            bid=_bid,
-            fee_rates=fee_rates,
-            daily_transaction=_daily_transaction,
-            min_size=_min_size,
-            max_size=_max_size,
-            initial_price=_initial_price,
-            volatility=_volatility,
-            block_time=_block_time,
-            period=_period,
-            sigma_level=_sigma_level,
-        )
-        pnls_arr.append(pnls)
-        earned_noise_fees_arr.append(earned_fees)
-        earned_arb_fees_arr.append(earned_fees_from_arb)
+    _params = {
+        "bid": _bid,
+        "fee_rates": fee_rates,
+        "daily_transaction": _daily_transaction,
+        "min_size": _min_size,
+        "max_size": _max_size,
+        "initial_price": _initial_price,
+        "volatility": _volatility,
+        "block_time": _block_time,
+        "period": _period,
+        "sigma_level": _sigma_level,
+        "event_driven": True,
+    }
+
+    # repeat 50 times, all fee tiers see the same noise trades
+    pnls_arr, earned_noise_fees_arr, earned_arb_fees_arr = run_monte_carlo(
+        50, seed=_seed, common_random_numbers=True, **_params
+    )
+    # small reference run with independent noise trades per fee tier
+    reference_pnls = run_monte_carlo(10, seed=_seed + 1, progress=False, **_params)[0]
 
     # show results (mean & std) using tabulate
-    headers = [
-        "Fee Rate (bps)",
-        "PnL Mean",
-        "PnL Std",
-        "Noise Fee Mean",
-        "Noise Fee Std",
-        "Arb Fee Mean",
-        "Arb Fee Std",
-    ]
-    data = []
-    for i, fee_rate in enumerate(fee_rates):
-        data.append(
-            [
-                fee_rate,
-                np.mean([pnl[i] for pnl in pnls_arr]),
-                np.std([pnl[i] for pnl in pnls_arr]),
-                np.mean([fee[i] for fee in earned_noise_fees_arr]),
-                np.std([fee[i] for fee in earned_noise_fees_arr]),
-                np.mean([fee[i] for fee in earned_arb_fees_arr]),
-                np.std([fee[i] for fee in earned_arb_fees_arr]),
-            ]
-        )
+    headers, data = summary_table(
+        fee_rates, pnls_arr, earned_noise_fees_arr, earned_arb_fees_arr
+    )
     print("\n")
     print(tabulate.tabulate(data, headers=headers, tablefmt="pretty"))
+
+    # fee tiers against the lowest one
+    headers, data = comparison_table(fee_rates, pnls_arr, reference=reference_pnls)
+    print(tabulate.tabulate(data, headers=headers, tablefmt="pretty"))
@@ -1,6 +1,10 @@
+import time
+
 import numpy as np
 import scipy as sp
-import matplotlib.pyplot as plt
+
+from synstation.montecarlo import RunningStats
+from synstation.paths import gbm_paths
 
 # We want to find the fee rate gamma that in expectation makes LPing profitable
 # Market Proposer pays B, and Treasury will add B / (2 * (sqrt(2) - 1)) to open a market
@@ -8,21 +12,35 @@ import matplotlib.pyplot as plt
 # The market will be settled with the final values p and 1 - p
 
 
+def get_chunks(n, chunk_size=None):
+    """
+    split range(n) into slices of at most chunk_size rows (all rows if None)
+    """
+    chunk_size = max(n, 1) if chunk_size is None else chunk_size
+    assert chunk_size >= 1
+    return [slice(i, min(i + chunk_size, n)) for i in range(0, n, chunk_size)]
+
+
 def generate_price_paths(
     T: int = 30,  # 30 days, for monthly contracts
     n: int = 1000,  # number of paths to generate
     sigma: float = 0.01,  # 1% daily volatility
     P_0: float = 1000,  # initial price
+    rng=None,  # seed or np.random.Generator
+    chunk_size: int | None = None,  # number of paths generated at once
 ):
     """
     Generate n price paths from Geometric Brownian Motion.
     mu is set according to sigma to make path martingale.
+    Paths are drawn in chunks of rows; the result does not depend on chunk_size.
+    For more paths than fit in memory, use synstation.paths.PathStore.gbm,
+    which writes the same paths to a memory-mapped file.
     """
+    rng = np.random.default_rng(rng)
     P = np.zeros((n, T))
 
-    for i in range(n):
-        z = np.cumsum(np.random.normal(0, sigma, T))
-        P[i] = P_0 * np.exp(z - (sigma**2) * np.arange(T) / 2)
+    for rows in get_chunks(n, chunk_size):
+        P[rows] = gbm_paths(rng, rows.stop - rows.start, T, sigma, P_0)
 
     return P
 
@@ -39,11 +57,12 @@ def get_S(
 ):
     """
     Calculate the redemption value of S, the derivative, based on given parameters.
+    P and P_0 may be arrays of the same (or broadcastable) shape.
     """
     if up:
-        return max(0, min(1, 0.5 * (1 + delta * (P - P_0) / P_0)))
+        return np.clip(0.5 * (1 + delta * (P - P_0) / P_0), 0, 1)
     else:
-        return max(0, min(1, 0.5 * (1 - delta * (P - P_0) / P_0)))
+        return np.clip(0.5 * (1 - delta * (P - P_0) / P_0), 0, 1)
 
 
 def get_LP_value(
@@ -66,17 +85,19 @@ def get_LP_losses(
     P,  # price paths
     B: float = 1000,  # payment from proposer
     delta: int = 1,  # delta
+    chunk_size: int | None = None,  # number of paths processed at once
 ):
     """
     P is n by T array where n is the number of paths and T is the number of time steps
+    P may be a memory map (PathStore.paths), it is then read chunk_size paths at a time
     for each time step, calculate the LP's loss, then take the summation
     return the array of losses
     """
     n, T = P.shape
     losses = np.zeros(n)
-    for i in range(n):
-        losses[i] = get_LP_loss(
-            B, get_S(P[i, T - 1], P_0=P[i, 0], delta=delta, up=True)
+    for rows in get_chunks(n, chunk_size):
+        losses[rows] = get_LP_loss(
+            B, get_S(P[rows, T - 1], P_0=P[rows, 0], delta=delta, up=True)
         )
 
     return losses
@@ -87,30 +108,81 @@ def get_swap_fee_earnings(
     B: float = 1000,  # payment from proposer
     delta: int = 1,  # delta
     gamma: float = 0.01,  # fee rate
+    chunk_size: int | None = None,  # number of paths processed at once
 ):
     """
     P is n by T array where n is the number of paths and T is the number of time steps
+    P may be a memory map (PathStore.paths), it is then read chunk_size paths at a time
     for each time step, calculate the swap fee earnings, then take the summation
     volume = L * (sqrt(S_t) - sqrt(S_{t-1})) + L * (sqrt(1 - S_t) - sqrt(1 - S_{t-1}))
     fee_earned = gamma * volume
     return the array of fee_earned
     """
-    n, T = P.shape
+    n = P.shape[0]
     fee_earned = np.zeros(n)
-    for i in range(n):
-        for t in range(1, T):
-            S_current = get_S(P[i, t], P_0=P[i, 0], delta=delta, up=True)
-            S_prev = get_S(P[i, t - 1], P_0=P[i, 0], delta=delta, up=True)
-            volume = get_L(B) * (
-                abs(np.sqrt(S_current) - np.sqrt(S_prev))
-                + abs(np.sqrt(1 - S_current) - np.sqrt(1 - S_prev))
-            )
-            fee_earned[i] += gamma * volume
+    for rows in get_chunks(n, chunk_size):
+        S = get_S(P[rows], P_0=P[rows, :1], delta=delta, up=True)
+        volume = get_L(B) * (
+            np.abs(np.diff(np.sqrt(S), axis=1))
+            + np.abs(np.diff(np.sqrt(1 - S), axis=1))
+        )
+        fee_earned[rows] = gamma * volume.sum(axis=1)
 
     return fee_earned
 
 
+def estimate_total_profit(
+    gammas,  # fee rates, evaluated on the same paths
+    target_half_width: float,  # confidence interval half-width of the expected profit
+    T: int = 30 * 24,  # number of time steps
+    sigma: float = 0.02 / np.sqrt(24),  # volatility per time step
+    P_0: float = 1000,  # initial price
+    B: float = 10000,  # payment from proposer
+    delta: int = 1,  # delta
+    k: float = 1,  # share of proposer among all swap fee earnings
+    confidence: float = 0.95,  # confidence level of the interval
+    chunk_size: int = 1000,  # paths drawn between convergence checks
+    min_paths: int = 1000,  # paths before a fee rate may stop
+    max_paths: int = 10**7,  # paths after which every fee rate stops
+    time_budget: float | None = None,  # seconds, then stop after the chunk
+    rng=None,  # seed or np.random.Generator
+):
+    """
+    expected total profit k * swap fee - LP loss for every fee rate,
+    drawing chunk_size paths at a time and keeping running statistics,
+    until the confidence interval of every fee rate is narrower than target_half_width.
+    a fee rate that converged takes no more samples.
+    return RunningStats of the total profit, count is the number of paths per fee rate
+    """
+    rng = np.random.default_rng(rng)
+    gammas = np.atleast_1d(np.asarray(gammas, dtype=float))
+    stats = RunningStats(len(gammas))
+    start = time.perf_counter()
+
+    while True:
+        active = np.flatnonzero(
+            ~stats.converged(target_half_width, confidence, min_paths)
+            & (stats.count < max_paths)
+        )
+        if not len(active):
+            break
+        if time_budget is not None and time.perf_counter() - start > time_budget:
+            break
+
+        P = generate_price_paths(T, chunk_size, sigma, P_0, rng)
+        LP_losses = get_LP_losses(P, B, delta)
+        volume = get_swap_fee_earnings(
+            P, B, delta, gamma=1
+        )  # fee earned per unit fee rate
+        profits = k * volume[:, None] * gammas[active] - LP_losses[:, None]
+        stats.update_batch(profits, active)
+
+    return stats
+
+
 def main():
+    import matplotlib.pyplot as plt
+
     # parameters
     B = 10000
     delta = 1
@@ -149,6 +221,13 @@ def main():
     expected_total_profit = np.mean(total_profit)
     print(f"Expected Total Profit: {expected_total_profit}")
 
+    # draw more paths until the expected total profit is known to within 1
+    stats = estimate_total_profit([gamma], 1, T, sigma, P_0, B, delta, k)
+    print(
+        f"Expected Total Profit: {stats.mean[0]:.2f} ± {stats.half_width()[0]:.2f} "
+        f"(95%, {stats.count[0]} paths)"
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,165 @@
+import time
+
 import numpy as np
-import scipy as sp
-import matplotlib.pyplot as plt
+import tabulate
+
+from find_fee_rate import get_L
+
+# Swap fee earnings are gamma * volume for a fixed set of price paths,
+# so the fee rate at which LPing breaks even (or earns a target margin) in expectation
+# is a ratio of two path averages: gamma = (E[LP loss] + margin * B) / (k * E[volume])
+# It is read off one pass over the paths, and bootstrapped over the same paths.
 
 
 class CPMM:
+    """
+    LP position of find_fee_rate: the Up and Down outcome pools of a binary market
+    with liquidity L, opened at probability 0.5, with Up worth S when settled.
+    """
+
     def __init__(self, _L: float, _P: float, _fee_rate: float):
         self.L = _L
-        self.P = _P
+        self.P = _P  # initial price of the underlying asset
         self.fee_rate = _fee_rate
+
+    @classmethod
+    def from_payment(cls, B: float, P: float, fee_rate: float):
+        """
+        pools opened with the payment B from the proposer and the treasury share
+        """
+        return cls(get_L(B), P, fee_rate)
+
+    def get_S(self, P, delta: int = 1):
+        """
+        redemption value of the Up token at prices P of the underlying asset
+        """
+        return np.clip(0.5 * (1 + delta * (P - self.P) / self.P), 0, 1)
+
+    def get_value(self, S):
+        """
+        value of the LP position when Up is worth S
+        """
+        return self.L * (2 * np.sqrt(S) + 2 * np.sqrt(1 - S) - 1)
+
+    def get_loss(self, S):
+        """
+        loss of the LP position from S = 0.5 to S (last axis is time)
+        """
+        return self.get_value(0.5) - self.get_value(S[..., -1])
+
+    def get_volume(self, S):
+        """
+        traded volume of both pools along S (last axis is time)
+        """
+        return self.L * (
+            np.abs(np.diff(np.sqrt(S), axis=-1)).sum(axis=-1)
+            + np.abs(np.diff(np.sqrt(1 - S), axis=-1)).sum(axis=-1)
+        )
+
+    def get_swap_fee_earnings(self, S):
+        return self.fee_rate * self.get_volume(S)
+
+
+def bootstrap_weights(n, n_bootstrap=1000, rng=None):
+    """
+    (n_bootstrap, n) resampling weights, each row a multinomial draw of n paths divided by n,
+    so weights @ x are the bootstrap means of x
+    """
+    rng = np.random.default_rng(rng)
+    return rng.multinomial(n, np.full(n, 1 / n), size=n_bootstrap) / n
+
+
+def solve_fee_rate(
+    volumes,  # traded volume per path
+    losses,  # LP loss per path
+    B: float,  # payment from proposer
+    k: float = 1,  # share of proposer among all swap fee earnings
+    margin: float = 0.0,  # target expected profit as a share of B, 0: break-even
+    weights=None,  # bootstrap_weights, None: no interval
+    confidence: float = 0.95,
+):
+    """
+    fee rate whose expected profit k * gamma * volume - loss equals margin * B,
+    with the percentile bootstrap interval when weights are given
+    return (fee rate, low, high)
+    """
+    numerator = np.asarray(losses) + margin * B
+    denominator = k * np.asarray(volumes)
+    fee_rate = float(numerator.mean() / denominator.mean())
+    if weights is None:
+        return fee_rate, np.nan, np.nan
+
+    boot = (weights @ numerator) / (weights @ denominator)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(boot, [alpha, 1 - alpha])
+    return fee_rate, float(low), float(high)
+
+
+def solve_scenarios(
+    scenarios,  # iterable of (sigma, delta, B)
+    T: int = 30 * 24,  # number of time steps
+    n: int = 1000,  # number of paths
+    k: float = 1,  # share of proposer among all swap fee earnings
+    margins=(0.0,),  # target expected profits as shares of B
+    n_bootstrap: int = 1000,  # bootstrap resamples, 0: no interval
+    confidence: float = 0.95,
+    rng=None,  # seed or np.random.Generator
+):
+    """
+    break-even / target-margin fee rates of many (sigma, delta, B) scenarios.
+    all scenarios share the same standard normal draws and bootstrap resamples
+    (common random numbers), so the paths are drawn once, every sigma reuses them,
+    every delta reuses the paths of its sigma, and B only scales L
+    (loss, volume and margin * B all scale with B, so the fee rate does not depend on it).
+    return one row per scenario and margin:
+    (sigma, delta, B, margin, fee rate, low, high)
+    """
+    rng = np.random.default_rng(rng)
+    Z = np.cumsum(rng.standard_normal((n, T)), axis=1)
+    weights = bootstrap_weights(n, n_bootstrap, rng) if n_bootstrap else None
+    drift = np.arange(T) / 2
+
+    scenarios = [tuple(scenario) for scenario in scenarios]
+    rows = []
+    for sigma in dict.fromkeys(s[0] for s in scenarios):
+        # GBM relative to the first step, see find_fee_rate.get_swap_fee_earnings
+        log_P = sigma * Z - sigma**2 * drift
+        P = np.exp(log_P - log_P[:, :1])
+        for delta in dict.fromkeys(s[1] for s in scenarios if s[0] == sigma):
+            unit = CPMM(1.0, 1.0, 1.0)
+            S = unit.get_S(P, delta)
+            unit_volumes, unit_losses = unit.get_volume(S), unit.get_loss(S)
+            for _, _, B in (s for s in scenarios if s[:2] == (sigma, delta)):
+                L = get_L(B)
+                for margin in margins:
+                    fee_rate, low, high = solve_fee_rate(
+                        L * unit_volumes,
+                        L * unit_losses,
+                        B,
+                        k,
+                        margin,
+                        weights,
+                        confidence,
+                    )
+                    rows.append((float(sigma), delta, B, margin, fee_rate, low, high))
+
+    return rows
+
+
+if __name__ == "__main__":
+    sigmas = np.array([0.01, 0.02, 0.03, 0.05]) / np.sqrt(24)  # hourly volatility
+    deltas = [1, 2, 5, 10]
+    payments = [1_000, 10_000, 100_000]
+    scenarios = [(s, d, b) for s in sigmas for d in deltas for b in payments]
+
+    start = time.perf_counter()
+    rows = solve_scenarios(scenarios, margins=(0.0, 0.05), rng=1)
+    elapsed = time.perf_counter() - start
+
+    headers = ["Daily Vol", "Delta", "B", "Margin", "Fee Rate", "Low", "High"]
+    data = [
+        (sigma * np.sqrt(24), delta, B, margin, fee, low, high)
+        for sigma, delta, B, margin, fee, low, high in rows
+    ]
+    print(tabulate.tabulate(data, headers=headers, floatfmt=".5g"))
+    print(f"{len(scenarios)} scenarios in {elapsed:.2f} s")
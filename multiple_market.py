@@ -1,6 +1,8 @@
 import numpy as np
 from tabulate import tabulate
 
+from synstation import kernels
+
 
 class AMM:
     def __init__(self, X, p, fee_bps):
@@ -16,14 +18,14 @@ class AMM:
         self.precision = 1e-6
 
     def buy_X(self, dx):
-        dx = np.clip(
-            dx, 0, self.X - self.precision
-        )  # you cannot buy more than the pool has
-
-        new_X = self.X - dx
-        new_Y = self.L**2 / (new_X + self.L)
-        fee_accu = (new_Y - self.Y) * self.fee_bps / (10**4 - self.fee_bps)
-        dy = new_Y - self.Y + fee_accu
+        # you cannot buy more than the pool has
+        if kernels.is_scalar(self.L, self.X, dx):
+            buy_X = kernels.buy_X
+        else:
+            buy_X = kernels.buy_X_array
+        new_X, new_Y, fee_accu, dy = buy_X(
+            self.X, self.Y, self.L, self.fee_bps, dx, self.precision
+        )
 
         self.fee_Y += fee_accu
         self.X = new_X
@@ -32,10 +34,11 @@ class AMM:
         return dy
 
     def sell_X(self, dx):
-        fee_accu = dx * self.fee_bps / 10**4
-        new_X = self.X + dx - fee_accu
-        new_Y = self.L**2 / (new_X + self.L)
-        dy = self.Y - new_Y
+        if kernels.is_scalar(self.L, self.X, dx):
+            sell_X = kernels.sell_X
+        else:
+            sell_X = kernels.sell_X_array
+        new_X, new_Y, fee_accu, dy = sell_X(self.X, self.Y, self.L, self.fee_bps, dx)
 
         self.fee_X += fee_accu
         self.X = new_X
@@ -47,21 +50,203 @@ class AMM:
         return self.Y / (self.X + self.L)
 
     def get_quote(self, dx, is_buy):
+        scalar = kernels.is_scalar(self.L, self.X, dx)
         if is_buy:
-            dx = np.clip(dx, 0, self.X - self.precision)
-
-            new_X = self.X - dx
-            new_Y = self.L**2 / (new_X + self.L)
-            fee_accu = (new_Y - self.Y) * self.fee_bps / (10**4 - self.fee_bps)
-            dy = new_Y - self.Y + fee_accu
+            buy_X = kernels.buy_X if scalar else kernels.buy_X_array
+            dy = buy_X(self.X, self.Y, self.L, self.fee_bps, dx, self.precision)[3]
         else:
-            fee_accu = dx * self.fee_bps / 10**4
-            new_X = self.X + dx - fee_accu
-            new_Y = self.L**2 / (new_X + self.L)
-            dy = self.Y - new_Y
+            sell_X = kernels.sell_X if scalar else kernels.sell_X_array
+            dy = sell_X(self.X, self.Y, self.L, self.fee_bps, dx)[3]
 
         return dy  # dy should be always positive
 
+    def get_quotes(self, dx, is_buy):
+        """
+        get_quote for arrays of sizes and directions (broadcast against each other),
+        all quoted against the current state of the pool
+        """
+        dx, is_buy = np.broadcast_arrays(np.asarray(dx, dtype=float), is_buy)
+        # rounds like L**2 in the plain Python get_quote, not the compiled L * L
+        L_squared = np.float_power(self.L, 2)
+
+        # buy
+        dx_buy = np.clip(dx, 0, self.X - self.precision)
+        new_Y = L_squared / ((self.X - dx_buy) + self.L)
+        fee_accu = (new_Y - self.Y) * self.fee_bps / (10**4 - self.fee_bps)
+        dy_buy = new_Y - self.Y + fee_accu
+
+        # sell
+        fee_accu = dx * self.fee_bps / 10**4
+        new_Y = L_squared / ((self.X + dx - fee_accu) + self.L)
+        dy_sell = self.Y - new_Y
+
+        return np.where(is_buy, dy_buy, dy_sell)
+
+
+class MultiOutcomeMarket:
+    """
+    All n outcome pools O_j <-> GM of one market held as arrays,
+    one entry per outcome, with the same pool math as AMM.
+    Quotes and routed trades are array operations over the pools,
+    so their cost stays flat as the number of outcomes grows.
+    L**2 goes through np.float_power to round exactly like AMM's scalar power
+    in plain Python (numba missing or SYNSTATION_DISABLE_JIT=1);
+    the compiled kernels use L * L and may differ in the last bit.
+    """
+
+    def __init__(self, X, p, fee_bps):
+        """
+        Invariant Curve: (X + L) * Y = L**2 for every pool
+        """
+        X, p, fee_bps = (
+            np.array(a, dtype=float) for a in np.broadcast_arrays(X, p, fee_bps)
+        )
+        self.X = X
+        self.L = X * np.sqrt(p) / (1 - np.sqrt(p))
+        self.Y = self.L * np.sqrt(p)
+        self.fee_bps = fee_bps
+        self.fee_X = np.zeros_like(X)
+        self.fee_Y = np.zeros_like(X)
+        self.precision = 1e-6
+
+    @classmethod
+    def from_amms(cls, amms):
+        """
+        copy the current state of a list of AMM
+        """
+        market = cls(np.ones(len(amms)), 0.5, 0)
+        for k in ("X", "L", "Y", "fee_bps", "fee_X", "fee_Y"):
+            setattr(market, k, np.array([getattr(amm, k) for amm in amms], float))
+        return market
+
+    def __len__(self):
+        return len(self.X)
+
+    def get_prob(self):
+        return self.Y / (self.X + self.L)
+
+    def _buy_X(self, dx, pools):
+        """
+        new state of pools after buying dx of X from each, and GM paid
+        """
+        X, Y, L, fee_bps = (
+            self.X[pools],
+            self.Y[pools],
+            self.L[pools],
+            self.fee_bps[pools],
+        )
+        dx = np.clip(dx, 0, X - self.precision)  # you cannot buy more than the pool has
+
+        new_X = X - dx
+        new_Y = np.float_power(L, 2) / (new_X + L)
+        fee_accu = (new_Y - Y) * fee_bps / (10**4 - fee_bps)
+        dy = new_Y - Y + fee_accu
+
+        return new_X, new_Y, fee_accu, dy
+
+    def _sell_X(self, dx, pools):
+        """
+        new state of pools after selling dx of X to each, and GM received
+        """
+        X, Y, L, fee_bps = (
+            self.X[pools],
+            self.Y[pools],
+            self.L[pools],
+            self.fee_bps[pools],
+        )
+
+        fee_accu = dx * fee_bps / 10**4
+        new_X = X + dx - fee_accu
+        new_Y = np.float_power(L, 2) / (new_X + L)
+        dy = Y - new_Y
+
+        return new_X, new_Y, fee_accu, dy
+
+    def get_quote(self, dx, is_buy, pools=slice(None)):
+        """
+        GM paid (is_buy) or received for trading dx on each of the given pools
+        """
+        if is_buy:
+            return self._buy_X(dx, pools)[3]
+        else:
+            return self._sell_X(dx, pools)[3]
+
+    def buy_X(self, dx, pools=slice(None)):
+        new_X, new_Y, fee_accu, dy = self._buy_X(dx, pools)
+        self.fee_Y[pools] += fee_accu
+        self.X[pools] = new_X
+        self.Y[pools] = new_Y
+
+        return dy
+
+    def sell_X(self, dx, pools=slice(None)):
+        new_X, new_Y, fee_accu, dy = self._sell_X(dx, pools)
+        self.fee_X[pools] += fee_accu
+        self.X[pools] = new_X
+        self.Y[pools] = new_Y
+
+        return dy
+
+    def others(self, i):
+        """
+        mask of every outcome except i
+        """
+        mask = np.ones(len(self), dtype=bool)
+        mask[i] = False
+        return mask
+
+    def buy_quote(self, i, dx, dx_i):
+        """
+        same as buy_quote(amms, i, dx, dx_i),
+        dx_i may be an array of splits (see buy_quotes)
+        """
+        dx_j = np.expand_dims(dx - dx_i, -1)
+        quote_i = self.get_quote(dx_i, True, i)
+        quote_j = np.sum(self.get_quote(dx_j, False, self.others(i)), axis=-1)
+
+        return quote_i + dx - dx_i - quote_j
+
+    def buy_multiple(self, i, dx, dx_i):
+        """
+        same as buy_multiple(amms, i, dx, dx_i)
+        """
+        dy_i = self.buy_X(dx_i, i)
+        dy_j = np.sum(self.sell_X(dx - dx_i, self.others(i)))
+
+        return dy_i + dx - dx_i - dy_j
+
+    def sell_quote(self, i, dx, dx_i):
+        """
+        same as sell_quote(amms, i, dx, dx_i),
+        dx_i may be an array of splits (see sell_quotes)
+        """
+        dx_j = np.expand_dims(dx - dx_i, -1)
+        quote_i = self.get_quote(dx_i, False, i)
+        quote_j = np.sum(self.get_quote(dx_j, True, self.others(i)), axis=-1)
+
+        return quote_i + dx - dx_i - quote_j
+
+    def sell_multiple(self, i, dx, dx_i):
+        """
+        same as sell_multiple(amms, i, dx, dx_i)
+        """
+        dy_i = self.sell_X(dx_i, i)
+        dy_j = np.sum(self.buy_X(dx - dx_i, self.others(i)))
+
+        return dy_i + dx - dx_i - dy_j
+
+
+def pool_arrays(amms):
+    """
+    X, L and fee_bps of every pool, from a list of AMM or a MultiOutcomeMarket
+    """
+    if isinstance(amms, MultiOutcomeMarket):
+        return amms.X, amms.L, amms.fee_bps
+    return (
+        np.array([getattr(amm, k) for amm in amms], dtype=float)
+        for k in ("X", "L", "fee_bps")
+    )
+
 
 def buy_quote(amms, i, dx, dx_i):
     """
@@ -85,6 +270,27 @@ def buy_quote(amms, i, dx, dx_i):
     return dy
 
 
+def buy_quotes(amms, i, dx, dx_i):
+    """
+    buy_quote for a whole array of dx_i splits against the same pool states,
+    e.g. to plot the cost curve of every split of one trade
+    """
+    dx_i = np.asarray(dx_i, dtype=float)
+    if isinstance(amms, MultiOutcomeMarket):
+        return amms.buy_quote(i, dx, dx_i)
+    n = len(amms)
+
+    quote_i = amms[i].get_quotes(dx_i, True)
+    quote_j = np.sum(
+        np.stack(
+            [amms[j].get_quotes(dx - dx_i, False) for j in range(n) if j != i], axis=-1
+        ),
+        axis=-1,
+    )
+
+    return quote_i + dx - dx_i - quote_j
+
+
 def buy_multiple(amms, i, dx, dx_i):
     """
     buy dx amount of O_i and return the GM spent
@@ -129,6 +335,26 @@ def sell_quote(amms, i, dx, dx_i):
     return dy
 
 
+def sell_quotes(amms, i, dx, dx_i):
+    """
+    sell_quote for a whole array of dx_i splits against the same pool states
+    """
+    dx_i = np.asarray(dx_i, dtype=float)
+    if isinstance(amms, MultiOutcomeMarket):
+        return amms.sell_quote(i, dx, dx_i)
+    n = len(amms)
+
+    quote_i = amms[i].get_quotes(dx_i, False)
+    quote_j = np.sum(
+        np.stack(
+            [amms[j].get_quotes(dx - dx_i, True) for j in range(n) if j != i], axis=-1
+        ),
+        axis=-1,
+    )
+
+    return quote_i + dx - dx_i - quote_j
+
+
 def sell_multiple(amms, i, dx, dx_i):
     """
     return the amount of GM received by selling dx amount of O_i
@@ -197,33 +423,118 @@ def find_optimal_split(amms, i, dx, is_buy):
     return (left + right) / 2
 
 
-def generate_input(n=0, fee_bps=0, total_dx=0):
+def solve_optimal_split(amms, i, dx, is_buy, tol=1e-12, max_iter=100):
+    """
+    Find the optimal split of weights for a given trade via Newton's method
+
+    Every pool follows (X + L) * Y = L**2, so marginal prices are closed form:
+    buying a on O_i costs L_i**2 / ((1 - f_i) * (X_i + L_i - a)**2) per unit,
+    selling r on O_j pays (1 - f_j) * L_j**2 / (X_j + L_j + (1 - f_j) * r)**2 per unit.
+    At the optimum the direct path and the mint & sell (burn & buy) path
+    have equal marginal prices, i.e. S(dx_i) = 1 for a sum S of c / d(dx_i)**2 terms
+    with d linear in dx_i. Newton is run on S**(-1/2) - 1, which is exactly linear
+    when one pool dominates, and kept inside a bracket with bisection as fallback.
+    Search bounds are the same as find_optimal_split.
+    amms may also be a MultiOutcomeMarket.
+
+    return the optimal amount of O_i to be traded at O_i <-> GM pool,
+    and the number of iterations (evaluations of the marginal prices) used
+    """
+    precision = 1e-6
+    X, L, fee_bps = pool_arrays(amms)
+    f = fee_bps / 10**4
+    others = np.arange(len(X)) != i
+    K_i, L_i, f_i = X[i] + L[i], L[i], f[i]
+    K_j, L_j, f_j = X[others] + L[others], L[others], f[others]
+
+    if is_buy:
+        left = precision
+        right = min(dx, X[i] * (1 - precision))
+
+        def marginal(a):
+            # S(a) and S'(a), S increases with a
+            d_i = K_i - a
+            d_j = K_j + (1 - f_j) * (dx - a)
+            S = L_i**2 / ((1 - f_i) * d_i**2) + np.sum((1 - f_j) * L_j**2 / d_j**2)
+            dS = 2 * L_i**2 / ((1 - f_i) * d_i**3) + np.sum(
+                2 * (1 - f_j) ** 2 * L_j**2 / d_j**3
+            )
+            return S, dS
+    else:
+        left = max(precision, dx - np.min(X[others]) + precision)
+        right = dx
+
+        def marginal(a):
+            # S(a) and S'(a), S decreases with a
+            d_i = K_i + (1 - f_i) * a
+            d_j = K_j - (dx - a)
+            S = (1 - f_i) * L_i**2 / d_i**2 + np.sum(L_j**2 / ((1 - f_j) * d_j**2))
+            dS = -2 * (1 - f_i) ** 2 * L_i**2 / d_i**3 - np.sum(
+                2 * L_j**2 / ((1 - f_j) * d_j**3)
+            )
+            return S, dS
+
+    if left >= right:
+        return (left + right) / 2, 0
+
+    # the objective is convex (buy) or concave (sell) in dx_i,
+    # so past the optimum S - 1 has the sign of dS
+    def past_optimum(S, dS):
+        return (S - 1) * dS > 0
+
+    # the optimum may sit on the bound away from the pole of S
+    if is_buy and past_optimum(*marginal(left)):
+        return left, 1
+    if not is_buy and not past_optimum(*marginal(right)):
+        return right, 1
+
+    # start next to the pole of S, where S**(-1/2) is closest to linear
+    a = right if is_buy else left
+    for iteration in range(2, max_iter + 2):
+        S, dS = marginal(a)
+        if past_optimum(S, dS):
+            right = a
+        else:
+            left = a
+
+        step = a + 2 * S * (1 - np.sqrt(S)) / dS
+        if abs(step - a) <= tol * a or right - left <= tol * a:
+            return min(max(step, left), right), iteration
+        if not left < step < right:
+            step = (left + right) / 2
+        a = step
+
+    return a, max_iter + 1
+
+
+def generate_input(n=0, fee_bps=0, total_dx=0, rng=None):
     """
     Generate random input for testing: AMMs and trade size
+    rng: seed or np.random.Generator
     """
+    rng = np.random.default_rng(rng)
     if n == 0:
-        n = np.random.randint(2, 25)
+        n = rng.integers(2, 25)
     if fee_bps == 0:
-        fee_bps = np.random.choice([1, 5, 10, 30, 100])
+        fee_bps = rng.choice([1, 5, 10, 30, 100])
     if total_dx == 0:
-        total_dx = np.random.randint(1, 100_000) * np.sqrt(n)
+        total_dx = rng.integers(1, 100_000) * np.sqrt(n)
 
-    i = n - 1  # np.random.randint(0, n - 1)
-    L_array = [10_000 + np.random.randint(0, 100_000) for _ in range(n)]
-    p_array = [np.random.randint(1, 100) for _ in range(n)]
-    p_sum = sum(p_array)  # * np.random.choice([0.8, 0.9, 1.0, 1.1, 1.2])
-    for j in range(n):
-        p_array[j] /= p_sum
+    i = n - 1  # rng.integers(0, n - 1)
+    L_array = 10_000 + rng.integers(0, 100_000, n)
+    p_array = rng.integers(1, 100, n)
+    p_sum = sum(p_array)  # * rng.choice([0.8, 0.9, 1.0, 1.1, 1.2])
+    p_array = p_array / p_sum
 
     amms = [AMM(L_array[i], p_array[i], fee_bps) for i in range(n)]
 
     return amms, i, total_dx
 
 
-def test_buy():
+def test_buy(rng=None):
     print("-" * 100)
     print("Test Optimal Split for Buying\n")
-    amms, i, total_dx = generate_input(32, 0, 0)
+    amms, i, total_dx = generate_input(32, 0, 0, rng)
     print(f"fee rate: {amms[0].fee_bps} bps\n")
 
     # Optimal Split
@@ -234,6 +545,8 @@ def test_buy():
     ]
     print("Optimal Split:")
     print(tabulate(data_split, headers=["Path", "Amount"], floatfmt=".0f") + "\n")
+    newton_dx_i, iterations = solve_optimal_split(amms, i, total_dx, True)
+    print(f"Newton: {newton_dx_i:.0f} on O_i <-> GM after {iterations} iterations\n")
 
     # Before the trade
     data_amm = []
@@ -268,10 +581,10 @@ def test_buy():
     )
 
 
-def test_sell():
+def test_sell(rng=None):
     print("-" * 100)
     print("Test Optimal Split for Selling\n")
-    amms, i, total_dx = generate_input(32, 0, 0)
+    amms, i, total_dx = generate_input(32, 0, 0, rng)
     print(f"fee rate: {amms[0].fee_bps} bps\n")
 
     # Optimal Split
@@ -282,6 +595,8 @@ def test_sell():
     ]
     print("Optimal Split:")
     print(tabulate(data_split, headers=["Path", "Amount"], floatfmt=".0f") + "\n")
+    newton_dx_i, iterations = solve_optimal_split(amms, i, total_dx, False)
+    print(f"Newton: {newton_dx_i:.0f} on O_i <-> GM after {iterations} iterations\n")
 
     # Before the trade
     data_amm = []
@@ -317,5 +632,6 @@ def test_sell():
 
 
 if __name__ == "__main__":
-    test_buy()
-    test_sell()
+    rng = np.random.default_rng()
+    test_buy(rng)
+    test_sell(rng)
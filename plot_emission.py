@@ -1,20 +1,24 @@
 import numpy as np
-import matplotlib.pyplot as plt
+
+from synstation.emission import EmissionSchedule
 
 
 # Function to calculate Y(t)
 def supply_over_time(M, H, time_range):
     t = np.linspace(0, time_range, 1000)  # Create a time array from 0 to time_range
-    Y_t = M * (1 - 2 ** (-t / H))  # Apply the formula
+    schedule = EmissionSchedule(M, H)
+    Y_t = schedule.emitted(t * schedule.blocks_per_day)  # M * (1 - 2^(-t / H))
     return t, Y_t
 
 
 # Function to plot the result
-def plot_supply(M, H, time_range):
+def plot_supply(M, H, time_range, path="plots/SYN_emission.png", show=True):
+    import matplotlib.pyplot as plt
+
     t, Y_t = supply_over_time(M, H, time_range)
 
-    plt.figure(figsize=(8, 6))
-    plt.plot(t, Y_t, label=f"M = {M/10**6:.2f} million, H = {H} days")
+    fig = plt.figure(figsize=(8, 6))
+    plt.plot(t, Y_t, label=f"M = {M / 10**6:.2f} million, H = {H} days")
     plt.axhline(
         y=M, color="r", linestyle="--", label="Maximum Emission (M)"
     )  # maximum supply
@@ -38,10 +42,13 @@ def plot_supply(M, H, time_range):
     plt.legend()
 
     # save the plot
-    plt.savefig("plots/SYN_emission.png")
+    plt.savefig(path)
 
     # show the plot
-    plt.show()
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+"""
+Headless rendering of the figures in plots/.
+
+Every figure is a plotting function, its parameters and the files it is computed from.
+A figure is rendered again only when the hash of those changes
+(or the image is missing), otherwise the existing image is kept.
+Figures are rendered with the Agg backend over a process pool.
+
+python render_plots.py                     # render the outdated figures
+python render_plots.py treasury_payment --force
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from importlib.metadata import PackageNotFoundError, version
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# name: plotting function (module:function), keyword arguments,
+# and the files the figure is computed from, relative to ROOT
+FIGURES = {
+    "SYN_emission": {
+        "function": "plot_emission:plot_supply",
+        "params": {"M": 500_000_000, "H": 180, "time_range": 720},
+        "inputs": ["plot_emission.py", "synstation/emission.py"],
+    },
+    "treasury_payment": {
+        "function": "treasury_payment:plot_treasury_payment",
+        "params": {"max_N": 10, "B": 1000, "rng": 1337},
+        "inputs": ["treasury_payment.py"],
+    },
+}
+
+
+def figure_key(name, figure):
+    """
+    hash of the figure's function, parameters, input files and library versions
+    """
+    h = hashlib.sha256()
+    record = {
+        "name": name,
+        "function": figure["function"],
+        "params": figure["params"],
+    }
+    for package in ("numpy", "matplotlib"):
+        try:
+            record[package] = version(package)
+        except PackageNotFoundError:
+            record[package] = None
+    h.update(json.dumps(record, sort_keys=True).encode())
+    for path in figure["inputs"]:
+        with open(os.path.join(ROOT, path), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def render_figure(function, params, path):
+    """
+    call function(**params, path=path, show=False) with the Agg backend
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    module, name = function.split(":")
+    getattr(importlib.import_module(module), name)(**params, path=path, show=False)
+    return path
+
+
+def render_plots(
+    names=None,  # figures to render, None: all of FIGURES
+    output="plots",  # folder of the images, relative to ROOT
+    cache_file=".cache/plots.json",  # hashes of the rendered images, relative to ROOT
+    force=False,  # render even when up to date
+    workers=None,  # number of processes, None: all cores, 1: run in this process
+    progress=True,
+):
+    """
+    render the outdated figures, return the names of the rendered ones
+    """
+    names = list(FIGURES) if names is None else names
+    output = os.path.join(ROOT, output)
+    cache_file = os.path.join(ROOT, cache_file)
+    os.makedirs(output, exist_ok=True)
+
+    cache = {}
+    if os.path.exists(cache_file):
+        with open(cache_file) as f:
+            cache = json.load(f)
+
+    pending = {}
+    for name in names:
+        key = figure_key(name, FIGURES[name])
+        path = os.path.join(output, f"{name}.png")
+        if force or cache.get(name) != key or not os.path.exists(path):
+            pending[name] = (key, path)
+        elif progress:
+            print(f"{name}: up to date")
+
+    def done(name):
+        cache[name] = pending[name][0]
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file + ".tmp", "w") as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(cache_file + ".tmp", cache_file)
+        if progress:
+            print(f"{name}: rendered {os.path.relpath(pending[name][1], ROOT)}")
+
+    if workers == 1 or len(pending) == 1:
+        for name, (_, path) in pending.items():
+            render_figure(FIGURES[name]["function"], FIGURES[name]["params"], path)
+            done(name)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    render_figure,
+                    FIGURES[name]["function"],
+                    FIGURES[name]["params"],
+                    path,
+                ): name
+                for name, (_, path) in pending.items()
+            }
+            for future in as_completed(futures):
+                future.result()
+                done(futures[future])
+
+    return list(pending)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="render the figures in plots/")
+    parser.add_argument("names", nargs="*", help=f"figures of {', '.join(FIGURES)}")
+    parser.add_argument("--force", action="store_true", help="ignore the cache")
+    parser.add_argument("--workers", type=int, help="number of processes")
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - FIGURES.keys()
+    if unknown:
+        parser.error(f"unknown figures: {', '.join(sorted(unknown))}")
+
+    render_plots(args.names or None, force=args.force, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Parameter sweeps of fee_simulation.spectral_market_simulation.
+
+Every cell of the grid is a set of simulation parameters, run `repetitions` times.
+Its statistics are cached in cache_dir under a hash of the parameters,
+the seed, the number of repetitions and the simulation code,
+so extending a grid only runs the new cells.
+
+python sweep.py --volatility 0.01 0.02 --daily-transaction 200 2000 --seed 1
+python sweep.py --grid grid.json --repetitions 100 --seed 1 --csv results.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import tabulate
+
+import fee_simulation
+from synstation import kernels
+
+# parameters of fee_simulation.__main__
+DEFAULTS = {
+    "bid": 10000,
+    "fee_rates": [1, 5, 10, 20, 30, 50, 100],
+    "daily_transaction": 200,
+    "min_size": 1,
+    "max_size": 100,
+    "initial_price": 4000,
+    "volatility": 0.01,
+    "block_time": 2,
+    "period": 90,
+    "sigma_level": 3,
+    "event_driven": True,
+}
+
+# files whose content determines the simulation results
+CODE_FILES = ("fee_simulation.py", "synstation/amm.py", "synstation/kernels.py")
+
+STATS = ("pnl", "noise_fee", "arb_fee")
+
+
+def code_version():
+    """
+    hash of the simulation code, the numpy version and the kernel backend
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256()
+    for name in CODE_FILES:
+        with open(os.path.join(root, name), "rb") as f:
+            h.update(f.read())
+    h.update(f"numpy {np.__version__} jit {kernels.JIT}".encode())
+    return h.hexdigest()[:16]
+
+
+def expand_grid(grid, base=None):
+    """
+    every combination of the values in grid, on top of base (DEFAULTS by default)
+    grid: {parameter: list of values}, a fee_rates value is a list of fee tiers
+    """
+    base = DEFAULTS if base is None else base
+    names = list(grid)
+    return [
+        {**base, **dict(zip(names, values))}
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def cell_key(params, seed, repetitions, code):
+    record = {
+        "params": params,
+        "seed": seed,
+        "repetitions": repetitions,
+        "code": code,
+    }
+    return hashlib.sha256(json.dumps(record, sort_keys=True).encode()).hexdigest()
+
+
+def cell_stats(params, seed, repetitions, code, pnls, noise_fees, arb_fees):
+    """
+    mean & std over repetitions of every fee tier of a cell
+    """
+    result = {
+        "params": params,
+        "seed": seed,
+        "repetitions": repetitions,
+        "code": code,
+    }
+    for name, values in zip(STATS, (pnls, noise_fees, arb_fees)):
+        result[f"{name}_mean"] = np.mean(values, axis=0).tolist()
+        result[f"{name}_std"] = np.std(values, axis=0).tolist()
+    return result
+
+
+def write_json(path, record):
+    with open(path + ".tmp", "w") as f:
+        json.dump(record, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def run_sweep(
+    grid,  # {parameter: list of values}, see expand_grid
+    repetitions=50,  # simulations per cell
+    seed=None,  # root seed of every cell, None draws fresh entropy
+    cache_dir=".cache/sweep",  # folder of the cached cell results
+    workers=None,  # number of processes, None: all cores, 1: run in this process
+    base=None,  # parameters not in grid, DEFAULTS by default
+    progress=True,  # print progress while repetitions come in
+):
+    """
+    statistics of every cell of the grid, in grid order.
+    cached cells are read back, the others are run repetition by repetition
+    over one process pool and written to the cache as soon as they complete.
+    every cell uses the same root seed, so cells are compared on common random numbers,
+    and a cell gives the same numbers as fee_simulation.run_monte_carlo(repetitions, seed)
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    cells = expand_grid(grid, base)
+    code = code_version()
+    os.makedirs(cache_dir, exist_ok=True)
+
+    results = [None] * len(cells)
+    pending = {}
+    for c, params in enumerate(cells):
+        path = os.path.join(
+            cache_dir, f"{cell_key(params, seed, repetitions, code)[:24]}.json"
+        )
+        if os.path.exists(path):
+            with open(path) as f:
+                results[c] = json.load(f)
+        else:
+            tiers = len(params["fee_rates"])
+            pending[c] = {
+                "path": path,
+                "left": repetitions,
+                "values": np.zeros((len(STATS), repetitions, tiers)),
+            }
+
+    if progress:
+        print(f"{len(cells) - len(pending)} cached, {len(pending)} to run")
+
+    def collect(c, k, outcome):
+        cell = pending[c]
+        cell["values"][:, k] = outcome
+        cell["left"] -= 1
+        if not cell["left"]:
+            results[c] = cell_stats(cells[c], seed, repetitions, code, *cell["values"])
+            write_json(cell["path"], results[c])
+
+    seeds = np.random.SeedSequence(seed).spawn(repetitions)
+    tasks = [(c, k) for c in pending for k in range(repetitions)]
+    if workers == 1:
+        for done, (c, k) in enumerate(tasks, start=1):
+            collect(c, k, fee_simulation._run_repetition(seeds[k], cells[c]))
+            if progress:
+                print(f"\rRunning simulation {done}/{len(tasks)} ...", end="")
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for c, k in tasks:
+                future = executor.submit(
+                    fee_simulation._run_repetition, seeds[k], cells[c]
+                )
+                futures[future] = (c, k)
+            for done, future in enumerate(as_completed(futures), start=1):
+                collect(*futures[future], future.result())
+                if progress:
+                    print(f"\rRunning simulation {done}/{len(tasks)} ...", end="")
+    if progress and tasks:
+        print()
+
+    return results
+
+
+def sweep_table(results, grid):
+    """
+    one row per cell and fee tier: the swept parameters, then mean & std of every statistic
+    """
+    swept = [name for name in grid if name != "fee_rates"]
+    headers = [*swept, "Fee Rate (bps)"]
+    for name in STATS:
+        headers += [f"{name} mean", f"{name} std"]
+
+    data = []
+    for result in results:
+        params = result["params"]
+        for t, fee_rate in enumerate(params["fee_rates"]):
+            row = [params[name] for name in swept] + [fee_rate]
+            for name in STATS:
+                row += [result[f"{name}_mean"][t], result[f"{name}_std"][t]]
+            data.append(row)
+    return headers, data
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="sweep spectral_market_simulation over a parameter grid"
+    )
+    parser.add_argument("--grid", help="JSON file {parameter: list of values}")
+    parser.add_argument(
+        "--fee-rates", type=float, nargs="+", help="fee tiers of every cell (bps)"
+    )
+    for name, default in DEFAULTS.items():
+        if name in ("fee_rates", "event_driven"):
+            continue
+        parser.add_argument(
+            f"--{name.replace('_', '-')}",
+            type=float,
+            nargs="+",
+            help=f"values of {name} (default {default})",
+        )
+    parser.add_argument("--repetitions", type=int, default=50)
+    parser.add_argument(
+        "--seed", type=int, help="root seed, required to reuse the cache"
+    )
+    parser.add_argument("--workers", type=int, help="number of processes")
+    parser.add_argument("--cache-dir", default=".cache/sweep")
+    parser.add_argument("--csv", help="also write the table to this CSV file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    grid = {}
+    if args.grid:
+        with open(args.grid) as f:
+            grid.update(json.load(f))
+
+    # keep integers integral so cache keys do not depend on the spelling
+    def number(v):
+        return int(v) if float(v).is_integer() else v
+
+    if args.fee_rates:
+        grid["fee_rates"] = [[number(v) for v in args.fee_rates]]
+    for name in DEFAULTS:
+        values = getattr(args, name, None)
+        if name != "fee_rates" and values:
+            grid[name] = [number(v) for v in values]
+
+    seed = args.seed
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    print(f"seed: {seed}")
+
+    results = run_sweep(grid, args.repetitions, seed, args.cache_dir, args.workers)
+    headers, data = sweep_table(results, grid)
+    print(tabulate.tabulate(data, headers=headers, tablefmt="pretty"))
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(data)
+
+
+if __name__ == "__main__":
+    main()
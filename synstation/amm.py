@@ -1,5 +1,7 @@
 import numpy as np
 
+from synstation import kernels
+
 
 class AMM:
     def __init__(self, X, p, fee_bps):
@@ -7,9 +9,9 @@ class AMM:
         (X + L) * Y = L**2
         fee is always charged in token Y
         """
-        self.L = X * np.sqrt(p) / (1 - np.sqrt(p))
-        self.X = X
-        self.Y = X * p / (1 - np.sqrt(p))
+        self.L = kernels.as_float(X * np.sqrt(p) / (1 - np.sqrt(p)))
+        self.X = kernels.as_float(X)
+        self.Y = kernels.as_float(X * p / (1 - np.sqrt(p)))
         self.fee_bps = fee_bps
         self.noise_fee = 0
         self.arb_fee = 0
@@ -21,24 +23,24 @@ class AMM:
         Noise trader sells dy amount of token Y
         to buy X from AMM
         """
-        new_Y = np.clip(self.Y + dy, 1, self.L)
-        new_X = self.L**2 / new_Y - self.L
-
-        self.noise_fee += abs(new_Y - self.Y) * self.fee_bps / 10000
-        self.X = new_X
-        self.Y = new_Y
+        if kernels.is_scalar(self.L, self.Y, dy):
+            swap_Y = kernels.swap_Y
+        else:
+            swap_Y = kernels.swap_Y_array
+        self.X, self.Y, volume = swap_Y(self.L, self.Y, dy)
+        self.noise_fee += volume * self.fee_bps / 10000
 
     def sell(self, dy):
         """
         Noise trader sells token X
         to receive dy amount of token Y
         """
-        new_Y = np.clip(self.Y - dy, 1, self.L)
-        new_X = self.L**2 / new_Y - self.L
-
-        self.noise_fee += abs(new_Y - self.Y) * self.fee_bps / 10000
-        self.X = new_X
-        self.Y = new_Y
+        if kernels.is_scalar(self.L, self.Y, dy):
+            swap_Y = kernels.swap_Y
+        else:
+            swap_Y = kernels.swap_Y_array
+        self.X, self.Y, volume = swap_Y(self.L, self.Y, -dy)
+        self.noise_fee += volume * self.fee_bps / 10000
 
     def arbitrage(self, P_ext):
         """
@@ -46,32 +48,27 @@ class AMM:
         to make profit from the difference between
         the external price P_ext and the AMM price
         """
-        P = self.Y / (self.X + self.L)
-
-        if P_ext > P * (1 + self.fee_bps / 10000):
-            # buy X
-            new_P = P_ext / (1 + self.fee_bps / 10000)
-            new_Y = np.clip(self.L * np.sqrt(new_P), 1, self.L)
-            new_X = self.L**2 / new_Y - self.L
-
-            self.arb_fee += abs(new_Y - self.Y) * self.fee_bps / 10000
-            self.X = new_X
-            self.Y = new_Y
-        elif P_ext * (1 + self.fee_bps / 10000) < P:
-            # sell X
-            new_P = P_ext * (1 + self.fee_bps / 10000)
-            new_Y = np.clip(self.L * np.sqrt(new_P), 1, self.L)
-            new_X = self.L**2 / new_Y - self.L
-
-            self.arb_fee += abs(new_Y - self.Y) * self.fee_bps / 10000
-            self.X = new_X
-            self.Y = new_Y
-        else:
-            pass
+        self.X, self.Y, volume = kernels.arbitrage_Y(
+            self.L, self.X, self.Y, self.fee_bps, P_ext
+        )
+        self.arb_fee += volume * self.fee_bps / 10000
 
     def get_value(self, P_ext):
         return self.Y + self.X * P_ext
 
+    def get_quotes(self, dy, is_buy):
+        """
+        amount of X received (is_buy, see buy) or paid (see sell)
+        for arrays of dy and directions, broadcast against each other,
+        all quoted against the current state of the pool
+        (same rounding as the plain Python kernels, see BatchAMM)
+        """
+        dy, is_buy = np.broadcast_arrays(np.asarray(dy, dtype=float), is_buy)
+        new_Y = np.clip(self.Y + np.where(is_buy, dy, -dy), 1, self.L)
+        new_X = np.float_power(self.L, 2) / new_Y - self.L
+
+        return np.where(is_buy, self.X - new_X, new_X - self.X)
+
     def sell_X(self, dx):
         """
         Arbitrageur sells dx amount of token X
@@ -98,27 +95,147 @@ class AMM:
         self.Y = new_Y
 
 
+class BatchAMM:
+    """
+    Struct-of-arrays version of AMM.
+    Every state variable holds one entry per pool, so many pools
+    (e.g. a fee rate x seed grid) advance with a single array operation.
+    X, p and fee_bps are broadcast against each other, any shape works.
+
+    Every trade method takes an optional boolean mask;
+    pools where the mask is False are left untouched.
+    The numbers match the scalar AMM pool by pool
+    (L**2 goes through np.float_power to round like the scalar power,
+    array ** 2 is a plain multiply that can differ in the last bit).
+    That holds for the plain Python kernels (numba missing or
+    SYNSTATION_DISABLE_JIT=1); compiled kernels use L * L and may differ
+    from these in the last bit.
+    """
+
+    def __init__(self, X, p, fee_bps):
+        X, p, fee_bps = (
+            np.array(a, dtype=float) for a in np.broadcast_arrays(X, p, fee_bps)
+        )
+        # asarray keeps 0-d state an array, arithmetic on 0-d returns scalars
+        self.L = np.asarray(X * np.sqrt(p) / (1 - np.sqrt(p)))
+        self.X = X
+        self.Y = np.asarray(X * p / (1 - np.sqrt(p)))
+        self.fee_bps = fee_bps
+        self.noise_fee = np.zeros_like(X)
+        self.arb_fee = np.zeros_like(X)
+        self.fee_X = np.zeros_like(X)
+        self.fee_Y = np.zeros_like(X)
+
+    @property
+    def shape(self):
+        return self.X.shape
+
+    def _update(self, new_X, new_Y, mask):
+        """
+        write new reserves into the pools selected by mask
+        """
+        np.copyto(self.X, new_X, where=mask)
+        np.copyto(self.Y, new_Y, where=mask)
+
+    def _accrue(self, fee, amount, mask):
+        """
+        add amount * fee_bps / 10000 to the given fee accumulator
+        """
+        np.add(fee, amount * self.fee_bps / 10000, out=fee, where=mask)
+
+    def buy(self, dy, mask=True):
+        """
+        Noise trader sells dy amount of token Y
+        to buy X from AMM
+        """
+        new_Y = np.clip(self.Y + dy, 1, self.L)
+        new_X = np.float_power(self.L, 2) / new_Y - self.L
+
+        self._accrue(self.noise_fee, np.abs(new_Y - self.Y), mask)
+        self._update(new_X, new_Y, mask)
+
+    def sell(self, dy, mask=True):
+        """
+        Noise trader sells token X
+        to receive dy amount of token Y
+        """
+        new_Y = np.clip(self.Y - dy, 1, self.L)
+        new_X = np.float_power(self.L, 2) / new_Y - self.L
+
+        self._accrue(self.noise_fee, np.abs(new_Y - self.Y), mask)
+        self._update(new_X, new_Y, mask)
+
+    def arbitrage(self, P_ext, mask=True):
+        """
+        Arbitrageur buys or sells token Y in every pool
+        whose price is outside of the fee band around P_ext
+        """
+        P = self.Y / (self.X + self.L)
+        fee_multiplier = 1 + self.fee_bps / 10000
+
+        buy = P_ext > P * fee_multiplier
+        sell = P_ext * fee_multiplier < P
+        mask = (buy | sell) & mask
+
+        new_P = np.where(buy, P_ext / fee_multiplier, P_ext * fee_multiplier)
+        new_Y = np.clip(self.L * np.sqrt(new_P), 1, self.L)
+        new_X = np.float_power(self.L, 2) / new_Y - self.L
+
+        self._accrue(self.arb_fee, np.abs(new_Y - self.Y), mask)
+        self._update(new_X, new_Y, mask)
+
+    def get_value(self, P_ext):
+        return self.Y + self.X * P_ext
+
+    def sell_X(self, dx, mask=True):
+        """
+        Arbitrageur sells dx amount of token X
+        and receives token Y
+        """
+        new_X = self.X + dx
+        new_Y = np.float_power(self.L, 2) / (new_X + self.L)
+
+        self._accrue(self.fee_X, np.abs(new_X - self.X), mask)
+        self._update(new_X, new_Y, mask)
+
+    def buy_X(self, dx, mask=True):
+        """
+        Arbitrageur buys dx amount of token X
+        and pays token Y
+        """
+        assert np.all((dx <= self.X) | np.logical_not(mask))
+        new_X = self.X - dx
+        new_Y = np.float_power(self.L, 2) / (new_X + self.L)
+
+        self._accrue(self.fee_Y, np.abs(new_Y - self.Y), mask)
+        self._update(new_X, new_Y, mask)
+
+
 class BinaryMarket:
     """
     Prediction market with range 0 to 1 and binary outcome
     Always initialized with 0.5 / 0.5 probabilities
     """
 
-    def __init__(self, bid, fee_bps):
+    def __init__(self, bid, fee_bps, rng=None):
         X = bid / 2
         self.YesMarket = AMM(X, 0.5, fee_bps)
         self.NoMarket = AMM(X, 0.5, fee_bps)
+        self.rng = np.random.default_rng(rng)  # seed or np.random.Generator
 
     def get_value(self, P_ext):
         return self.YesMarket.get_value(P_ext) + self.NoMarket.get_value(1 - P_ext)
 
-    def noise_trade(self, dy):
+    def noise_trade(self, dy, rand=None):
         """
         randomly select a market to trade
         randomly select direction
         execute trade
+        rand: pre-drawn Uniform(0,1) picking market and direction,
+        drawn from self.rng if not given
         """
-        rand = np.random.rand()
+        if rand is None:
+            rand = self.rng.random()
         if rand < 0.25:
             self.YesMarket.buy(dy)
         elif rand < 0.5:
@@ -0,0 +1,109 @@
+"""
+SYN emission schedule, Y(t) = M * (1 - 2^(-t / H)) with halving period H.
+
+The halving period can change over time: with h(t) the number of halvings
+elapsed by time t (t / H for a single period, piecewise linear otherwise),
+Y(t) = M * (1 - 2^(-h(t))). Cumulative queries and their inverse are closed form,
+per-block accrual is generated chunk by chunk.
+"""
+
+import numpy as np
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class EmissionSchedule:
+    """
+    Emission of M tokens in total, halving every H days,
+    measured in blocks of block_time seconds. Block b covers the time [b, b + 1).
+    """
+
+    def __init__(
+        self,
+        M: float,  # maximum emission
+        H: float,  # halving period at launch, in days
+        block_time: float = 2,  # seconds per block
+        changes=(),  # (day, H) pairs: the halving period is H days from that day on
+    ):
+        assert M > 0
+        assert H > 0
+        assert block_time > 0
+        self.M = M
+        self.block_time = block_time
+        self.blocks_per_day = SECONDS_PER_DAY / block_time
+
+        days = [0.0] + [float(day) for day, _ in changes]
+        periods = [float(H)] + [float(period) for _, period in changes]
+        assert np.all(np.diff(days) > 0), "changes must be increasing"
+        assert all(period > 0 for period in periods)
+
+        # start of every segment and its halving period, in blocks
+        self.starts = np.array(days) * self.blocks_per_day
+        self.periods = np.array(periods) * self.blocks_per_day
+        # halvings elapsed at the start of every segment
+        self.halvings_at_starts = np.concatenate(
+            [[0.0], np.cumsum(np.diff(self.starts) / self.periods[:-1])]
+        )
+
+    def halvings(self, block):
+        """
+        number of halvings elapsed at block (a float, may be fractional)
+        """
+        block = np.asarray(block, dtype=float)
+        assert np.all(block >= 0)
+        segment = np.searchsorted(self.starts, block, side="right") - 1
+        return (
+            self.halvings_at_starts[segment]
+            + (block - self.starts[segment]) / self.periods[segment]
+        )
+
+    def emitted(self, block):
+        """
+        emission before block, i.e. over blocks 0, ..., block - 1
+        """
+        return -self.M * np.expm1(-np.log(2) * self.halvings(block))
+
+    def emitted_between(self, a, b):
+        """
+        emission over blocks a, ..., b - 1,
+        as M * 2^(-h(a)) * (1 - 2^(h(a) - h(b))) to keep single blocks precise
+        """
+        h_a, h_b = self.halvings(a), self.halvings(b)
+        return -self.M * np.exp2(-h_a) * np.expm1(-np.log(2) * (h_b - h_a))
+
+    def time_of_fraction(self, fraction):
+        """
+        time (in blocks, fractional) at which the share fraction of M has been emitted,
+        inf for fraction 1
+        """
+        fraction = np.asarray(fraction, dtype=float)
+        assert np.all((fraction >= 0) & (fraction <= 1))
+        with np.errstate(divide="ignore"):
+            halvings = -np.log1p(-fraction) / np.log(2)
+        segment = np.searchsorted(self.halvings_at_starts, halvings, side="right") - 1
+        return (
+            self.starts[segment]
+            + (halvings - self.halvings_at_starts[segment]) * self.periods[segment]
+        )
+
+    def block_of_fraction(self, fraction):
+        """
+        first block by the end of which the share fraction of M has been emitted
+        """
+        return np.maximum(np.ceil(self.time_of_fraction(fraction)) - 1, 0)
+
+    def block_of_amount(self, amount):
+        """
+        first block by the end of which amount tokens have been emitted
+        """
+        return self.block_of_fraction(np.asarray(amount, dtype=float) / self.M)
+
+    def accrual(self, start, stop, chunk_size=2**20):
+        """
+        yield (first block, emission of every block) over blocks start, ..., stop - 1,
+        at most chunk_size blocks at a time
+        """
+        assert 0 <= start <= stop
+        for first in range(start, stop, chunk_size):
+            blocks = np.arange(first, min(first + chunk_size, stop), dtype=float)
+            yield first, self.emitted_between(blocks, blocks + 1)
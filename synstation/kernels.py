@@ -0,0 +1,258 @@
+"""
+Hot-path kernels of the (X + L) * Y = L**2 curve.
+
+Compiled with numba when it is installed, plain Python on floats otherwise,
+which already avoids the 0-d NumPy overhead of np.clip / np.sqrt on scalars.
+Set SYNSTATION_DISABLE_JIT=1 to force the plain Python path.
+The scalar kernels only take floats, array arguments go to their NumPy
+counterparts (the *_array functions), see is_scalar.
+Compiled results may differ from the plain Python ones in the last bit
+(L**2 becomes L * L).
+
+python -m synstation.kernels times the kernels in the current mode.
+"""
+
+import math
+import os
+import time
+
+import numpy as np
+
+try:
+    if os.environ.get("SYNSTATION_DISABLE_JIT"):
+        raise ImportError("JIT disabled by SYNSTATION_DISABLE_JIT")
+    from numba import njit
+
+    JIT = True
+except ImportError:
+    JIT = False
+
+    def njit(*args, **kwargs):
+        return lambda function: function
+
+
+@njit(cache=True)
+def swap_Y(L, Y, dy):
+    """
+    move Y by dy along the curve, Y is kept in [1, L]
+    return new X, new Y and the Y volume traded
+    """
+    new_Y = min(max(Y + dy, 1.0), L)
+    new_X = L**2 / new_Y - L
+    return new_X, new_Y, abs(new_Y - Y)
+
+
+@njit(cache=True)
+def arbitrage_Y(L, X, Y, fee_bps, P_ext):
+    """
+    move the pool price Y / (X + L) to the edge of the fee band around P_ext
+    if it is outside of it
+    return new X, new Y and the Y volume traded
+    """
+    P = Y / (X + L)
+    fee_multiplier = 1 + fee_bps / 10000
+
+    if P_ext > P * fee_multiplier:
+        new_P = P_ext / fee_multiplier
+    elif P_ext * fee_multiplier < P:
+        new_P = P_ext * fee_multiplier
+    else:
+        return X, Y, 0.0
+
+    new_Y = min(max(L * math.sqrt(new_P), 1.0), L)
+    new_X = L**2 / new_Y - L
+    return new_X, new_Y, abs(new_Y - Y)
+
+
+@njit(cache=True)
+def buy_X(X, Y, L, fee_bps, dx, precision):
+    """
+    buy dx of X (at most X - precision), the fee is charged on top in Y
+    return new X, new Y, fee and Y paid
+    """
+    dx = min(max(dx, 0.0), X - precision)
+
+    new_X = X - dx
+    new_Y = L**2 / (new_X + L)
+    fee_accu = (new_Y - Y) * fee_bps / (10**4 - fee_bps)
+    dy = new_Y - Y + fee_accu
+
+    return new_X, new_Y, fee_accu, dy
+
+
+@njit(cache=True)
+def sell_X(X, Y, L, fee_bps, dx):
+    """
+    sell dx of X, the fee is kept in X
+    return new X, new Y, fee and Y received
+    """
+    fee_accu = dx * fee_bps / 10**4
+    new_X = X + dx - fee_accu
+    new_Y = L**2 / (new_X + L)
+    dy = Y - new_Y
+
+    return new_X, new_Y, fee_accu, dy
+
+
+def is_scalar(*args):
+    """
+    True when every argument is a Python or NumPy number, so the scalar kernels
+    can take them (0-d arrays go to the *_array functions, numba rejects them)
+    """
+    for arg in args:
+        if not isinstance(arg, (float, int, np.number)):
+            return False
+    return True
+
+
+def as_float(x):
+    """
+    Python float for scalars, the fastest input of the scalar kernels, arrays unchanged
+    """
+    return float(x) if np.ndim(x) == 0 else np.asarray(x, dtype=float)
+
+
+def swap_Y_array(L, Y, dy):
+    """
+    swap_Y on arrays, broadcast against each other
+    """
+    new_Y = np.clip(Y + dy, 1, L)
+    new_X = L**2 / new_Y - L
+    return new_X, new_Y, np.abs(new_Y - Y)
+
+
+def buy_X_array(X, Y, L, fee_bps, dx, precision):
+    """
+    buy_X on arrays, broadcast against each other
+    """
+    dx = np.clip(dx, 0, X - precision)
+
+    new_X = X - dx
+    new_Y = L**2 / (new_X + L)
+    fee_accu = (new_Y - Y) * fee_bps / (10**4 - fee_bps)
+    dy = new_Y - Y + fee_accu
+
+    return new_X, new_Y, fee_accu, dy
+
+
+def sell_X_array(X, Y, L, fee_bps, dx):
+    """
+    sell_X on arrays, broadcast against each other
+    """
+    fee_accu = dx * fee_bps / 10**4
+    new_X = X + dx - fee_accu
+    new_Y = L**2 / (new_X + L)
+    dy = Y - new_Y
+
+    return new_X, new_Y, fee_accu, dy
+
+
+def compose_clamp_path(Y, c, A, B):
+    """
+    evaluate Y_t = clip(Y_{t-1} + c_t, A_t, B_t) along axis 0 without a per-step loop
+
+    maps of this form are closed under composition:
+    clip(clip(y + c1, A1, B1) + c2, A2, B2)
+      = clip(y + c1 + c2, clip(A1 + c2, A2, B2), clip(B1 + c2, A2, B2))
+    so the path is cut into rows, maps are composed column by column for all rows at once,
+    rows are chained through their composed maps, and every step is read off its prefix map.
+    Y: state before the first step, one entry per pool
+    c, A, B: (steps, pools) arrays, A <= B
+    return: (steps, pools) array of states after every step
+    """
+    steps, pools = c.shape
+    width = max(1, int(np.sqrt(steps)))
+    rows = -(-steps // width)
+
+    # pad with identity maps and view as (rows, width, pools)
+    def grid(a, identity):
+        out = np.full((rows * width, pools), identity)
+        out[:steps] = a
+        return out.reshape(rows, width, pools)
+
+    c, A, B = grid(c, 0.0), grid(A, -np.inf), grid(B, np.inf)
+
+    # prefix maps within each row
+    for w in range(1, width):
+        new_A = np.minimum(np.maximum(A[:, w - 1] + c[:, w], A[:, w]), B[:, w])
+        np.minimum(np.maximum(B[:, w - 1] + c[:, w], A[:, w]), B[:, w], out=B[:, w])
+        A[:, w] = new_A
+        c[:, w] += c[:, w - 1]
+
+    # state entering each row
+    Y_entry = np.empty((rows, pools))
+    for r in range(rows):
+        Y_entry[r] = Y
+        Y = np.minimum(np.maximum(Y + c[r, -1], A[r, -1]), B[r, -1])
+
+    path = np.minimum(np.maximum(Y_entry[:, None] + c, A), B)
+    return path.reshape(rows * width, pools)[:steps]
+
+
+@njit(cache=True)
+def _clamp_path_loop(Y, c, A, B):
+    steps, pools = c.shape
+    Y = Y.copy()
+    path = np.empty((steps, pools))
+    for t in range(steps):
+        for p in range(pools):
+            Y[p] = min(max(Y[p] + c[t, p], A[t, p]), B[t, p])
+            path[t, p] = Y[p]
+    return path
+
+
+def clamp_path(Y, c, A, B):
+    """
+    same as compose_clamp_path, as a compiled step-by-step loop when numba is available
+    """
+    if JIT:
+        return _clamp_path_loop(
+            np.ascontiguousarray(Y, dtype=float),
+            np.ascontiguousarray(c),
+            np.ascontiguousarray(A),
+            np.ascontiguousarray(B),
+        )
+    return compose_clamp_path(Y, c, A, B)
+
+
+def benchmark(trades=200_000, steps=2**20, pools=14):
+    """
+    time the scalar kernels against the former np.clip / np.sqrt expressions,
+    and clamp_path on a (steps, pools) path
+    """
+    rng = np.random.default_rng(0)
+    L, X, Y = 10_000.0, 4_142.0, 7_071.0
+    dys = rng.uniform(-100, 100, trades).tolist()
+    prices = rng.uniform(0.3, 0.7, trades).tolist()
+
+    start = time.perf_counter()
+    for dy in dys:
+        L**2 / np.clip(Y + dy, 1, L) - L
+    for P_ext in prices:
+        L**2 / np.clip(L * np.sqrt(P_ext / (1 + 30 / 10000)), 1, L) - L
+    numpy_time = time.perf_counter() - start
+
+    swap_Y(L, Y, 1.0), arbitrage_Y(L, X, Y, 30.0, 0.5)  # compile
+    start = time.perf_counter()
+    for dy in dys:
+        swap_Y(L, Y, dy)
+    for P_ext in prices:
+        arbitrage_Y(L, X, Y, 30.0, P_ext)
+    kernel_time = time.perf_counter() - start
+
+    c = np.zeros((steps, pools))
+    A = rng.uniform(0, 1, (steps, pools))
+    B = A + 0.1
+    clamp_path(np.zeros(pools), c[:8], A[:8], B[:8])  # compile
+    start = time.perf_counter()
+    clamp_path(np.zeros(pools), c, A, B)
+    path_time = time.perf_counter() - start
+
+    print(f"JIT: {JIT}")
+    print(f"{2 * trades} scalar swaps, np.clip / np.sqrt: {numpy_time:.3f} s")
+    print(f"{2 * trades} scalar swaps, kernels: {kernel_time:.3f} s")
+    print(f"clamp_path over {steps} x {pools}: {path_time:.3f} s")
+
+
+if __name__ == "__main__":
+    benchmark()
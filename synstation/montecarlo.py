@@ -0,0 +1,80 @@
+"""
+Running statistics for Monte Carlo estimates that stop once they are precise enough.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+
+
+def z_score(confidence=0.95):
+    """
+    two-sided normal quantile of the confidence level
+    """
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+class RunningStats:
+    """
+    Welford's running mean and variance of every entry of a fixed-shape array,
+    each entry with its own sample count, so entries can stop being updated
+    independently of each other
+    """
+
+    def __init__(self, shape):
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)  # sum of squared deviations from the mean
+
+    def update(self, x, index=slice(None)):
+        """
+        add one sample x of the entries at index
+        """
+        self.count[index] += 1
+        delta = x - self.mean[index]
+        self.mean[index] += delta / self.count[index]
+        self.m2[index] += delta * (x - self.mean[index])
+
+    def update_batch(self, samples, index=slice(None)):
+        """
+        add a batch of samples (along axis 0) of the entries at index,
+        merged with Chan's parallel formula
+        """
+        samples = np.asarray(samples, dtype=float)
+        n = len(samples)
+        if not n:
+            return
+        batch_mean = samples.mean(axis=0)
+        batch_m2 = ((samples - batch_mean) ** 2).sum(axis=0)
+
+        count = self.count[index]
+        total = count + n
+        delta = batch_mean - self.mean[index]
+        self.mean[index] += delta * n / total
+        self.m2[index] += batch_m2 + delta**2 * count * n / total
+        self.count[index] = total
+
+    @property
+    def variance(self):
+        """
+        sample variance, nan below two samples
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+
+    @property
+    def std_error(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(self.variance / self.count)
+
+    def half_width(self, confidence=0.95):
+        """
+        half-width of the normal confidence interval of the mean
+        """
+        return z_score(confidence) * self.std_error
+
+    def converged(self, target, confidence=0.95, min_count=10):
+        """
+        entries with at least min_count samples and a half-width at most target
+        """
+        return (self.count >= min_count) & (self.half_width(confidence) <= target)
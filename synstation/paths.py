@@ -0,0 +1,217 @@
+import hashlib
+import itertools
+import json
+import os
+
+import numpy as np
+
+
+def gbm_paths(rng, n, T, sigma, P_0):
+    """
+    n price paths of length T from Geometric Brownian Motion.
+    mu is set according to sigma to make path martingale.
+    """
+    z = np.cumsum(rng.normal(0, sigma, (n, T)), axis=1)
+    return P_0 * np.exp(z - (sigma**2) * np.arange(T) / 2)
+
+
+class PathStore:
+    """
+    Price paths kept on disk as an (n, T) .npy file and opened as a memory map,
+    so estimators can stream over millions of paths chunk by chunk.
+    A .json sidecar next to it records how the paths were generated.
+    """
+
+    def __init__(self, path):
+        """
+        open an existing store, path is the file name without extension
+        """
+        self.path = path
+        with open(path + ".json") as f:
+            self.header = json.load(f)
+        self.paths = np.load(path + ".npy", mmap_mode="r")
+
+    @property
+    def shape(self):
+        return self.paths.shape
+
+    @classmethod
+    def gbm(
+        cls,
+        directory,  # folder holding the cached stores
+        T,  # number of time steps
+        n,  # number of paths
+        sigma,  # volatility per time step
+        P_0,  # initial price
+        seed=None,  # int seed, None draws fresh entropy
+        chunk_size=10_000,  # number of paths generated at once
+    ):
+        """
+        GBM paths for the given parameters.
+        a store with identical parameters, seed and numpy version is reused,
+        otherwise the paths are written in chunks and the sidecar is written last,
+        so an interrupted run is never mistaken for a finished one.
+        """
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        header = {
+            "kind": "gbm",
+            "T": int(T),
+            "n": int(n),
+            "sigma": float(sigma),
+            "P_0": float(P_0),
+            "seed": int(seed),
+            "numpy": np.__version__,  # generator streams may change between versions
+        }
+        key = hashlib.sha256(json.dumps(header, sort_keys=True).encode()).hexdigest()
+        path = os.path.join(directory, f"gbm_{key[:16]}")
+        if os.path.exists(path + ".json"):
+            return cls(path)
+
+        os.makedirs(directory, exist_ok=True)
+        rng = np.random.default_rng(seed)
+        P = np.lib.format.open_memmap(
+            path + ".tmp.npy", mode="w+", dtype=float, shape=(n, T)
+        )
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            P[start:stop] = gbm_paths(rng, stop - start, T, sigma, P_0)
+        P.flush()
+        del P
+        os.replace(path + ".tmp.npy", path + ".npy")
+
+        with open(path + ".tmp.json", "w") as f:
+            json.dump(header, f, indent=2)
+        os.replace(path + ".tmp.json", path + ".json")
+
+        return cls(path)
+
+    def chunks(self, chunk_size=10_000):
+        """
+        yield consecutive blocks of at most chunk_size paths
+        """
+        n = self.shape[0]
+        for start in range(0, n, chunk_size):
+            yield self.paths[start : min(start + chunk_size, n)]
+
+
+class PriceSeries:
+    """
+    Historical price series, one (time, price) tick per row, sorted by time,
+    time in seconds. Ticks are read chunk by chunk,
+    from an (n, 2) .npy file opened as a memory map or from a Parquet file,
+    so a series of any length is replayed in bounded memory.
+    """
+
+    def __init__(
+        self,
+        path,  # .npy or .parquet file, see from_csv for CSV files
+        time_column="timestamp",  # Parquet columns
+        price_column="price",
+        chunk_size=1_000_000,  # ticks read at once
+    ):
+        assert path.endswith((".npy", ".parquet"))
+        self.path = path
+        self.time_column = time_column
+        self.price_column = price_column
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_csv(
+        cls,
+        path,  # CSV file with a header row
+        time_column="timestamp",  # numeric time in seconds
+        price_column="price",
+        chunk_size=1_000_000,  # rows converted at once
+    ):
+        """
+        series of a CSV file, converted once to a .npy file next to it
+        and converted again only when the CSV is newer
+        """
+        npy_path = os.path.splitext(path)[0] + ".npy"
+        if not os.path.exists(npy_path) or os.path.getmtime(
+            npy_path
+        ) < os.path.getmtime(path):
+            with open(path) as f:
+                header = next(f).strip().split(",")
+                n = sum(1 for line in f if line.strip())
+            columns = (header.index(time_column), header.index(price_column))
+
+            ticks = np.lib.format.open_memmap(
+                npy_path[:-4] + ".tmp.npy", mode="w+", dtype=float, shape=(n, 2)
+            )
+            with open(path) as f:
+                next(f)
+                lines = (line for line in f if line.strip())
+                for start in range(0, n, chunk_size):
+                    chunk = list(itertools.islice(lines, chunk_size))
+                    ticks[start : start + len(chunk)] = np.loadtxt(
+                        chunk, delimiter=",", usecols=columns, ndmin=2
+                    )
+            ticks.flush()
+            del ticks
+            os.replace(npy_path[:-4] + ".tmp.npy", npy_path)
+
+        return cls(npy_path, chunk_size=chunk_size)
+
+    def ticks(self):
+        """
+        yield (times, prices) of consecutive chunks of at most chunk_size ticks
+        """
+        if self.path.endswith(".npy"):
+            data = np.load(self.path, mmap_mode="r")
+            for start in range(0, len(data), self.chunk_size):
+                chunk = np.array(data[start : start + self.chunk_size])
+                yield chunk[:, 0], chunk[:, 1]
+            return
+
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet price series need pyarrow installed") from e
+
+        columns = [self.time_column, self.price_column]
+        for batch in pq.ParquetFile(self.path).iter_batches(
+            batch_size=self.chunk_size, columns=columns
+        ):
+            times = batch.column(self.time_column)
+            if pa.types.is_timestamp(times.type):
+                times = times.cast(pa.timestamp("ns")).cast(pa.int64())
+                times = times.to_numpy().astype(float) / 1e9
+            else:
+                times = times.to_numpy().astype(float)
+            yield times, batch.column(self.price_column).to_numpy().astype(float)
+
+    def resample(self, block_time, period=None, chunk_size=2**18):
+        """
+        yield the price of every block of block_time seconds from the first tick,
+        the price of the last tick at or before the block,
+        at most chunk_size blocks at a time and chunks never span two tick chunks.
+        period: days replayed, None: up to the last tick
+        """
+        stop = np.inf if period is None else int(period * 86400 / block_time)
+        t_0 = t_last = None
+        last_price = np.nan  # price of the previous tick chunk
+        block = 0
+        for times, prices in self.ticks():
+            if not len(times):
+                continue
+            assert np.all(np.diff(times) >= 0), "ticks must be sorted by time"
+            assert t_last is None or times[0] >= t_last, "ticks must be sorted by time"
+            if t_0 is None:
+                t_0 = times[0]
+
+            # blocks at or before the last tick of this chunk
+            end = min(stop, int((times[-1] - t_0) // block_time) + 1)
+            # tick - 1 before the first tick of the chunk is the previous chunk's last
+            prices = np.concatenate([[last_price], prices])
+            for first in range(block, end, chunk_size):
+                block_times = t_0 + block_time * np.arange(
+                    first, min(first + chunk_size, end)
+                )
+                yield prices[np.searchsorted(times, block_times, side="right")]
+            block = max(block, end)
+            t_last, last_price = times[-1], prices[-1]
+            if block >= stop:
+                return
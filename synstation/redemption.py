@@ -0,0 +1,312 @@
+"""
+Peg Stability Module redemptions: arbitrageurs redeem GM below peg against the reserve.
+
+Importing this module has no side effects, run_redemption_simulation / main run the study.
+The console script synstation-redemption calls main.
+"""
+
+import argparse
+
+import numpy as np
+
+
+class PegStabilityModule:
+    def __init__(self, reserve, totalSupply):
+        self.reserve = reserve  # USDC in the Peg Stability Module
+        self.totalSupply = totalSupply  # GM in circulation
+        self.baseFeeRate = 50  # in bps
+
+    def redeem(self, amount):
+        fee = amount * self.baseFeeRate / 10000 + amount**2 / (
+            self.totalSupply * 2
+        )  # feeRate = baseFeeRate + (amount /(totalSupply * 2))
+        assert self.reserve >= (amount - fee), "Insufficient reserve"
+        self.reserve -= amount - fee
+        self.totalSupply -= amount
+
+        return amount - fee
+
+    def quoteRedemption(self, amount, price):
+        fee = amount * self.baseFeeRate / 10000 + amount**2 / (self.totalSupply * 2)
+        return amount - fee - price * amount
+
+    def deposit(self, amount):
+        self.reserve += amount
+        self.totalSupply += amount
+
+
+class BatchPegStabilityModule:
+    """
+    Struct-of-arrays version of PegStabilityModule.
+    reserve, totalSupply and baseFeeRate hold one entry per scenario
+    and are broadcast against each other, any shape works.
+    """
+
+    def __init__(self, reserve, totalSupply, baseFeeRate=50):
+        self.reserve, self.totalSupply, self.baseFeeRate = (
+            np.array(a, dtype=float)
+            for a in np.broadcast_arrays(reserve, totalSupply, baseFeeRate)
+        )
+
+    @property
+    def shape(self):
+        return self.reserve.shape
+
+    def get_fee(self, amount):
+        return amount * self.baseFeeRate / 10000 + amount**2 / (self.totalSupply * 2)
+
+    def redeem(self, amount):
+        fee = self.get_fee(amount)
+        assert np.all(self.reserve >= (amount - fee)), "Insufficient reserve"
+        self.reserve -= amount - fee
+        self.totalSupply -= amount
+
+        return amount - fee
+
+    def quoteRedemption(self, amount, price):
+        return amount - self.get_fee(amount) - price * amount
+
+    def deposit(self, amount):
+        self.reserve += amount
+        self.totalSupply += amount
+
+    def get_optimal_redeem_amount(self, price):
+        return optimal_redeem_amount(
+            self.reserve, self.totalSupply, self.baseFeeRate, price
+        )
+
+
+def optimal_redeem_amount(reserve, totalSupply, baseFeeRate, price):
+    """
+    profit a - a * baseFee - a**2 / (2 * totalSupply) - price * a is concave in a,
+    so the optimum is where its derivative vanishes, capped by the reserve:
+    a = totalSupply * (1 - baseFee - price), 0 if that is negative
+    works on scalars and arrays alike
+    """
+    amount = totalSupply * (1 - baseFeeRate / 10000 - price)
+    return np.minimum(np.maximum(amount, 0), reserve)
+
+
+def get_optimal_redeem_amount(PSM, price, method="closed_form"):
+    """
+    find optimal redeem amount to maximize the profit.
+    method:
+    "closed_form": argmax of the concave quadratic profit, see optimal_redeem_amount
+    "ternary": ternary search down to 1e-6 relative precision
+    "verify": both, asserting the closed form is at least as profitable
+    """
+    if method == "closed_form":
+        return float(
+            optimal_redeem_amount(PSM.reserve, PSM.totalSupply, PSM.baseFeeRate, price)
+        )
+    if method == "verify":
+        amount = get_optimal_redeem_amount(PSM, price)
+        searched = get_optimal_redeem_amount(PSM, price, "ternary")
+        profit = PSM.quoteRedemption(amount, price)
+        best = PSM.quoteRedemption(searched, price)
+        assert profit >= best - 1e-9 * PSM.totalSupply, (amount, searched)
+        return amount
+    assert method == "ternary", f"unknown method {method}"
+
+    precision = 1e-6
+    left = precision
+    right = PSM.reserve
+
+    if price > 1 - PSM.baseFeeRate / 10000:
+        return 0
+    while right / left > 1 + precision:
+        left_third = left + (right - left) / 3
+        right_third = right - (right - left) / 3
+
+        if PSM.quoteRedemption(left_third, price) > PSM.quoteRedemption(
+            right_third, price
+        ):
+            right = right_third
+        else:
+            left = left_third
+
+    return (left + right) / 2
+
+
+def simulate_redemptions(PSM, iterations=100, rng=None, method="closed_form"):
+    """
+    arbitrageurs redeem the optimal amount against a random depeg of 0% ~ 2%
+    every iteration, until the reserve is empty or iterations run out.
+    rng: seed or np.random.Generator, depegs are drawn at once
+    method: see get_optimal_redeem_amount
+    return the redemption records as a table with a header row
+    """
+    rng = np.random.default_rng(rng)
+    depegs = rng.integers(0, 200, iterations, endpoint=True)
+
+    redemption_records = [
+        [
+            "Iteration",
+            "Redeem Amount",
+            "Profit",
+            "Reserve",
+            "Total Supply",
+            "Supply Decrease",
+            "Depeg",
+        ],
+        [0, 0, 0, PSM.reserve, PSM.totalSupply, "0%", "0%"],
+    ]
+
+    i = 1
+    while PSM.reserve > 0 and i < iterations:
+        prev_supply = PSM.totalSupply
+        price = (10000 - depegs[i]) / 10000
+        amount = get_optimal_redeem_amount(PSM, price, method)
+        # print(f"{i}-th quote: {price}, redeem amount: {amount}")
+        profit = PSM.redeem(amount) - amount * price
+        PSM.deposit(
+            profit
+        )  # deposit the profit back to the PSM to maintain both reserve and total supply
+
+        redemption_records.append(
+            [
+                i,
+                f"{amount:.0f}",
+                f"{profit:.0f}",
+                f"{PSM.reserve:.0f}",
+                f"{PSM.totalSupply:.0f}",
+                f"{100 - PSM.totalSupply / prev_supply * 100:.2f}%",
+                f"{100 * (1 - price):.2f}%",
+            ]
+        )
+        i += 1
+
+    return redemption_records
+
+
+def simulate_redemption_scenarios(
+    PSM,  # BatchPegStabilityModule, state is updated in place
+    iterations=100,  # steps, including the initial state
+    rng=None,  # seed or np.random.Generator
+    max_depeg_bps=200,  # depegs are drawn uniformly from 0 ~ max_depeg_bps bps
+    depegs=None,  # (iterations, *PSM.shape) depegs in bps, drawn if None
+):
+    """
+    simulate_redemptions for every scenario of PSM at once:
+    every step arbitrageurs redeem the optimal amount against that step's depeg
+    and the profit is deposited back, in scenarios whose reserve is not empty.
+    return a dict of (iterations, *PSM.shape) arrays, row 0 is the initial state:
+    depeg (bps), amount, profit, reserve, totalSupply
+    """
+    rng = np.random.default_rng(rng)
+    if depegs is None:
+        depegs = rng.integers(0, max_depeg_bps, (iterations, *PSM.shape), endpoint=True)
+
+    records = {
+        "depeg": np.asarray(depegs),
+        "amount": np.zeros((iterations, *PSM.shape)),
+        "profit": np.zeros((iterations, *PSM.shape)),
+        "reserve": np.zeros((iterations, *PSM.shape)),
+        "totalSupply": np.zeros((iterations, *PSM.shape)),
+    }
+    records["reserve"][0] = PSM.reserve
+    records["totalSupply"][0] = PSM.totalSupply
+
+    for i in range(1, iterations):
+        price = (10000 - records["depeg"][i]) / 10000
+        amount = np.where(PSM.reserve > 0, PSM.get_optimal_redeem_amount(price), 0)
+        profit = PSM.redeem(amount) - amount * price
+        PSM.deposit(profit)
+
+        records["amount"][i] = amount
+        records["profit"][i] = profit
+        records["reserve"][i] = PSM.reserve
+        records["totalSupply"][i] = PSM.totalSupply
+
+    return records
+
+
+def stress_table(records, percentiles=(1, 5, 25, 50, 75, 95, 99)):
+    """
+    percentiles over scenarios of the outcome of simulate_redemption_scenarios
+    """
+    supply = records["totalSupply"]
+    step_decrease = 100 * (1 - supply[1:] / supply[:-1])
+    outcomes = {
+        "Supply Decrease (%)": 100 * (1 - supply[-1] / supply[0]),
+        "Max Step Decrease (%)": step_decrease.max(axis=0),
+        "Final Reserve": records["reserve"][-1],
+        "Reserve Ratio (%)": 100 * records["reserve"][-1] / supply[-1],
+        "Total Redeemed": records["amount"].sum(axis=0),
+        "Total Profit": records["profit"].sum(axis=0),
+    }
+
+    headers = ["Outcome", *(f"p{q}" for q in percentiles)]
+    data = [
+        [name, *np.percentile(values, percentiles).round(2)]
+        for name, values in outcomes.items()
+    ]
+    return headers, data
+
+
+def run_redemption_simulation(
+    reserve=250_000,  # USDC in the Peg Stability Module
+    totalSupply=500_000,  # GM in circulation
+    iterations=100,  # steps of every run, including the initial state
+    scenarios=10_000,  # independent depeg sequences of the stress run, 0: skip it
+    rng=None,  # seed or np.random.Generator
+    method="closed_form",  # see get_optimal_redeem_amount
+    show=True,  # print the tables
+):
+    """
+    one run of simulate_redemptions, then simulate_redemption_scenarios over `scenarios`
+    independent depeg sequences from the same initial state.
+    return the records table of the single run and the records of the stress run
+    """
+    rng = np.random.default_rng(rng)
+    redemption_records = simulate_redemptions(
+        PegStabilityModule(reserve, totalSupply), iterations, rng, method
+    )
+    stress_records = None
+    if scenarios:
+        PSMs = BatchPegStabilityModule(np.full(scenarios, reserve), totalSupply)
+        stress_records = simulate_redemption_scenarios(PSMs, iterations, rng)
+
+    if show:
+        from tabulate import tabulate
+
+        # print the redemption records with tabulate
+        print(tabulate(redemption_records, headers="firstrow", tablefmt="pretty"))
+        if stress_records is not None:
+            headers, data = stress_table(stress_records)
+            print(tabulate(data, headers=headers, tablefmt="pretty"))
+
+    return redemption_records, stress_records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="simulate arbitrage redemptions against the Peg Stability Module"
+    )
+    parser.add_argument("--reserve", type=float, default=250_000)
+    parser.add_argument("--supply", type=float, default=500_000)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--scenarios", type=int, default=10_000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--method", choices=["closed_form", "ternary", "verify"], default="closed_form"
+    )
+    args = parser.parse_args(argv)
+
+    seed = args.seed
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    print(f"seed: {seed}")
+
+    run_redemption_simulation(
+        args.reserve,
+        args.supply,
+        args.iterations,
+        args.scenarios,
+        seed,
+        args.method,
+    )
+
+
+if __name__ == "__main__":
+    main()
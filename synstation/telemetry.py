@@ -0,0 +1,170 @@
+"""
+Per-block pool state recorded by spectral_market_simulation.
+
+TelemetryWriter keeps a fixed-size buffer and writes it out every time it fills,
+so memory does not grow with the length of the run.
+Records go to numbered .npz parts, or to a single Parquet file with pyarrow.
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+
+COLUMNS = ("X", "Y", "price", "noise_fee", "arb_fee", "arb_loss")
+
+
+class TelemetryWriter:
+    """
+    Sampled pool states of one simulation run, one row per sampled block:
+    block: block index
+    P_ext: fundamental value of the UP token at that block
+    X, Y, price: pool state at the end of the block, price = Y / (X + L)
+    noise_fee, arb_fee: cumulative fees earned
+    arb_loss: cumulative loss to arbitrageurs, the value given away at P_ext
+      by every arbitrage trade before fees, i.e. LVR
+    every column but block and P_ext has one entry per pool,
+    pools are ordered Yes, No of each market, described by meta.json
+    """
+
+    def __init__(
+        self,
+        directory,  # output folder, created if missing
+        every=1,  # record one block out of every
+        buffer_size=65_536,  # rows kept in memory before writing a part
+        format="npz",  # "npz" or "parquet"
+    ):
+        assert every >= 1
+        assert buffer_size >= 1
+        assert format in ("npz", "parquet")
+        self.directory = directory
+        self.every = every
+        self.buffer_size = buffer_size
+        self.format = format
+        self.rows = 0
+        self.parts = 0
+        self.buffers = None
+        self._parquet = None
+
+    def start(self, fee_bps, is_yes):
+        """
+        allocate the buffers for the given pools and write meta.json
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        pools = len(fee_bps)
+        self.fee_bps = np.asarray(fee_bps, dtype=float)
+        self.is_yes = np.asarray(is_yes, dtype=bool)
+        self.buffers = {
+            "block": np.empty(self.buffer_size, dtype=np.int64),
+            "P_ext": np.empty(self.buffer_size),
+            **{column: np.empty((self.buffer_size, pools)) for column in COLUMNS},
+        }
+        # running arb_loss of every pool, carried over when a run is written in segments
+        self.arb_loss = np.zeros(pools)
+        meta = {
+            "every": self.every,
+            "format": self.format,
+            "fee_bps": self.fee_bps.tolist(),
+            "is_yes": self.is_yes.tolist(),
+            "columns": ["block", "P_ext", *COLUMNS],
+        }
+        with open(os.path.join(self.directory, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def sampled(self, blocks):
+        """
+        mask of the blocks to be recorded
+        """
+        return np.asarray(blocks) % self.every == 0
+
+    def write(self, block, P_ext, **columns):
+        """
+        append rows: block and P_ext are 1-d, columns are (rows, pools)
+        """
+        block = np.atleast_1d(block)
+        P_ext = np.atleast_1d(P_ext)
+        columns = {k: np.atleast_2d(v) for k, v in columns.items()}
+        start = 0
+        while start < len(block):
+            count = min(len(block) - start, self.buffer_size - self.rows)
+            rows = slice(self.rows, self.rows + count)
+            self.buffers["block"][rows] = block[start : start + count]
+            self.buffers["P_ext"][rows] = P_ext[start : start + count]
+            for column in COLUMNS:
+                self.buffers[column][rows] = columns[column][start : start + count]
+            self.rows += count
+            start += count
+            if self.rows == self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        """
+        write the buffered rows out
+        """
+        if not self.rows:
+            return
+        data = {k: v[: self.rows] for k, v in self.buffers.items()}
+        if self.format == "npz":
+            path = os.path.join(self.directory, f"part-{self.parts:05d}.npz")
+            np.savez(path, **data)
+        else:
+            self._write_parquet(data)
+        self.parts += 1
+        self.rows = 0
+
+    def _write_parquet(self, data):
+        """
+        one row per (block, pool), appended as a row group
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("parquet telemetry needs pyarrow installed") from e
+
+        rows, pools = data["X"].shape
+        table = pa.table(
+            {
+                "block": np.repeat(data["block"], pools),
+                "P_ext": np.repeat(data["P_ext"], pools),
+                "pool": np.tile(np.arange(pools), rows),
+                "fee_bps": np.tile(self.fee_bps, rows),
+                "is_yes": np.tile(self.is_yes, rows),
+                **{column: data[column].ravel() for column in COLUMNS},
+            }
+        )
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(
+                os.path.join(self.directory, "telemetry.parquet"), table.schema
+            )
+        self._parquet.write_table(table)
+
+    def close(self):
+        self.flush()
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+
+def iter_telemetry(directory):
+    """
+    yield the .npz parts written by a TelemetryWriter as dicts of arrays, in order
+    """
+    for path in sorted(glob.glob(os.path.join(directory, "part-*.npz"))):
+        with np.load(path) as part:
+            yield dict(part)
+
+
+def load_telemetry(directory):
+    """
+    all .npz parts of a run concatenated, together with meta.json
+    """
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    parts = list(iter_telemetry(directory))
+    data = {
+        column: np.concatenate([part[column] for part in parts])
+        for column in meta["columns"]
+    }
+    return meta, data
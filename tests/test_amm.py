@@ -0,0 +1,103 @@
+import copy
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+
+import multiple_market
+from synstation import amm
+
+
+def test_multiple_market_quotes_take_arrays():
+    pool = multiple_market.AMM(1000.0, 0.3, 30)
+    dx = np.array([1.0, 2.0, 500.0, 5_000.0])
+    for is_buy in (True, False):
+        quotes = pool.get_quote(dx, is_buy)
+        assert quotes.shape == dx.shape
+        assert_allclose(quotes, [pool.get_quote(float(d), is_buy) for d in dx])
+
+
+def test_multiple_market_trades_take_arrays():
+    dx = np.array([1.0, 10.0, 100.0])
+    pools = multiple_market.AMM(1000.0, 0.3, 30)
+    dy = pools.buy_X(dx)
+    for d, expected in zip(dx, dy):
+        pool = multiple_market.AMM(1000.0, 0.3, 30)
+        assert_allclose(pool.buy_X(float(d)), expected)
+
+    # one pool per probability, sold into pool by pool
+    p = np.array([0.2, 0.5, 0.8])
+    pools = multiple_market.AMM(1000.0, p, 30)
+    dy = pools.sell_X(10.0)
+    for q, expected in zip(p, dy):
+        assert_allclose(multiple_market.AMM(1000.0, q, 30).sell_X(10.0), expected)
+
+
+def test_amm_noise_trades_take_arrays():
+    p = np.array([0.2, 0.5, 0.8])
+    dy = np.array([10.0, -50.0, 1e6])
+    pools = amm.AMM(1000.0, p, 30)
+    pools.buy(dy)
+    pools.sell(5.0)
+    for j in range(len(p)):
+        pool = amm.AMM(1000.0, p[j], 30)
+        pool.buy(dy[j])
+        pool.sell(5.0)
+        assert_allclose([pools.X[j], pools.Y[j]], [pool.X, pool.Y])
+        assert_allclose(pools.noise_fee[j], pool.noise_fee)
+
+
+def test_zero_dimensional_inputs():
+    # 0-d arrays take the NumPy path, the compiled scalar kernels reject them
+    expected = multiple_market.AMM(1000.0, 0.3, 30).get_quote(2.0, True)
+    assert_allclose(
+        multiple_market.AMM(1000.0, 0.3, 30).get_quote(np.array(2.0), True), expected
+    )
+    assert_allclose(multiple_market.AMM(1000.0, 0.3, 30).buy_X(np.array(2.0)), expected)
+    assert_allclose(
+        multiple_market.AMM(1000.0, 0.3, 30).sell_X(np.array(2.0)),
+        multiple_market.AMM(1000.0, 0.3, 30).sell_X(2.0),
+    )
+
+    amms, i, dx = multiple_market.generate_input(4, 30, 100, rng=0)
+    expected = multiple_market.buy_multiple(copy.deepcopy(amms), i, dx, dx / 2)
+    assert_allclose(
+        multiple_market.buy_multiple(amms, i, dx, np.array(dx / 2)), expected
+    )
+
+    pool, scalar = amm.AMM(1000.0, 0.3, 30), amm.AMM(1000.0, 0.3, 30)
+    pool.buy(np.array(10.0))
+    scalar.buy(10.0)
+    assert_allclose([pool.X, pool.Y], [scalar.X, scalar.Y])
+
+
+def test_batch_amm_matches_amm():
+    rng = np.random.default_rng(0)
+    fee_bps = np.array([1.0, 5.0, 30.0, 100.0, 300.0])
+    batch = amm.BatchAMM(5_000.0, 0.5, fee_bps)
+    pools = [amm.AMM(5_000.0, 0.5, fee) for fee in fee_bps]
+
+    P_ext = np.clip(0.5 + np.cumsum(rng.normal(0, 0.05, 500)), 0.01, 0.99)
+    for price in P_ext:
+        mask = rng.random(len(pools)) < 0.7
+        dy = rng.uniform(1, 500, len(pools))
+        sell = rng.random() < 0.5
+
+        batch.arbitrage(price, mask)
+        (batch.sell if sell else batch.buy)(dy, mask)
+        for j in np.flatnonzero(mask):
+            pools[j].arbitrage(price)
+            (pools[j].sell if sell else pools[j].buy)(dy[j])
+
+    for name in ("X", "Y", "noise_fee", "arb_fee"):
+        assert_array_equal(getattr(batch, name), [getattr(p, name) for p in pools])
+
+
+def test_batch_amm_takes_scalars():
+    batch = amm.BatchAMM(5_000.0, 0.5, 30)
+    batch.buy(10.0)
+    batch.arbitrage(0.4)
+    pool = amm.AMM(5_000.0, 0.5, 30)
+    pool.buy(10.0)
+    pool.arbitrage(0.4)
+    assert batch.shape == ()
+    assert_array_equal([batch.X, batch.Y], [pool.X, pool.Y])
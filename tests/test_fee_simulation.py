@@ -0,0 +1,136 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+import fee_simulation
+from synstation import amm
+from synstation.paths import PriceSeries
+
+FEE_RATES = [1, 10, 100]
+
+
+def make_markets():
+    return [
+        amm.BinaryMarket(bid=10_000, fee_bps=fee_bps, rng=0) for fee_bps in FEE_RATES
+    ]
+
+
+def run_block_loop(markets, P_ext, trade_blocks, trade_size, directions):
+    """
+    the per-block loop of spectral_market_simulation
+    """
+    trade_offsets = fee_simulation.arrival_index(trade_blocks, len(P_ext))
+    for i in range(len(P_ext)):
+        for market in markets:
+            market.arbitrage(P_ext[i])
+        for k in range(trade_offsets[i], trade_offsets[i + 1]):
+            for market, rand in zip(markets, directions[k]):
+                market.noise_trade(trade_size[k], rand)
+
+
+def state(markets):
+    return np.array(
+        [
+            (pool.X, pool.Y, pool.noise_fee, pool.arb_fee)
+            for market in markets
+            for pool in (market.YesMarket, market.NoMarket)
+        ]
+    )
+
+
+def assert_event_driven_matches_loop(P_ext, trade_blocks, trade_size, directions):
+    loop, event = make_markets(), make_markets()
+    run_block_loop(loop, P_ext, trade_blocks, trade_size, directions)
+    fee_simulation.advance_markets(event, P_ext, trade_blocks, trade_size, directions)
+    assert_allclose(state(event), state(loop), rtol=1e-9, atol=1e-9)
+
+
+def piecewise_constant(rng, runs, low=-0.2, high=1.2):
+    """
+    random walk held for random run lengths, clipped to [0, 1]
+    """
+    values = 0.5 + np.cumsum(rng.normal(0, 0.05, runs))
+    return np.clip(np.repeat(values, rng.integers(1, 20, runs)), 0, 1)
+
+
+def test_flat_peak_without_trades():
+    P_ext = np.array([0.5, 0.6, 1, 1, 0.6, 0.5])
+    empty = np.zeros(0, dtype=np.int64)
+    assert_event_driven_matches_loop(P_ext, empty, np.zeros(0), np.zeros((0, 3)))
+
+
+def test_flat_runs_and_clipped_stretches():
+    rng = np.random.default_rng(1)
+    P_ext = piecewise_constant(rng, 2_000)
+    assert np.mean((P_ext == 0) | (P_ext == 1)) > 0.1
+
+    trade_blocks = np.sort(rng.integers(0, len(P_ext), 500))
+    trade_size = rng.uniform(1, 100, len(trade_blocks))
+    directions = rng.random((len(trade_blocks), len(FEE_RATES)))
+    assert_event_driven_matches_loop(P_ext, trade_blocks, trade_size, directions)
+
+
+def test_spectral_market_simulation_with_clipped_prices():
+    params = {
+        "bid": 10_000,
+        "fee_rates": FEE_RATES,
+        "daily_transaction": 200,
+        "min_size": 1,
+        "max_size": 100,
+        "initial_price": 4_000,
+        "volatility": 0.01,
+        "block_time": 60,
+        "period": 10,
+        "sigma_level": 0.3,
+        "rng": 3,
+    }
+    loop = fee_simulation.spectral_market_simulation(**params)
+    event = fee_simulation.spectral_market_simulation(**params, event_driven=True)
+    for expected, actual in zip(loop, event):
+        assert_allclose(actual, expected, rtol=1e-9)
+
+
+def test_monte_carlo_does_not_depend_on_workers():
+    params = {
+        "bid": 10_000,
+        "fee_rates": FEE_RATES,
+        "daily_transaction": 200,
+        "min_size": 1,
+        "max_size": 100,
+        "initial_price": 4_000,
+        "volatility": 0.01,
+        "block_time": 600,
+        "period": 2,
+        "sigma_level": 1,
+    }
+    serial = fee_simulation.run_monte_carlo(4, 7, workers=1, progress=False, **params)
+    parallel = fee_simulation.run_monte_carlo(4, 7, workers=2, progress=False, **params)
+    for expected, actual in zip(serial, parallel):
+        assert np.array_equal(actual, expected)
+
+
+def test_replay_of_resampled_prices(tmp_path):
+    # 1 minute ticks resampled to 2 second blocks: runs of 30 equal prices
+    rng = np.random.default_rng(0)
+    times = 1.7e9 + 60 * np.arange(1_440.0)
+    prices = 3_000 * np.exp(np.cumsum(rng.normal(0, 0.01 / np.sqrt(1_440), 1_440)))
+    np.save(tmp_path / "ticks.npy", np.c_[times, prices])
+
+    params = {
+        "bid": 10_000,
+        "fee_rates": FEE_RATES,
+        "daily_transaction": 2_000,
+        "min_size": 1,
+        "max_size": 100,
+        "initial_price": None,
+        "volatility": 0.01,
+        "block_time": 2,
+        "period": 1,
+        "sigma_level": 2,
+        "rng": 1,
+        # several tick chunks, so the run is advanced segment by segment
+        "prices": PriceSeries(str(tmp_path / "ticks.npy"), chunk_size=500),
+    }
+    loop = fee_simulation.spectral_market_simulation(**params)
+    event = fee_simulation.spectral_market_simulation(**params, event_driven=True)
+    for expected, actual in zip(loop, event):
+        assert_allclose(actual, expected, rtol=1e-9)
@@ -0,0 +1,49 @@
+import copy
+
+from numpy.testing import assert_allclose, assert_array_equal
+
+import multiple_market
+
+
+def test_solve_optimal_split_matches_ternary_search():
+    for k in range(50):
+        amms, i, dx = multiple_market.generate_input(rng=k)
+        market = multiple_market.MultiOutcomeMarket.from_amms(amms)
+        for is_buy in (True, False):
+            quote = multiple_market.buy_quote if is_buy else multiple_market.sell_quote
+            searched = multiple_market.find_optimal_split(amms, i, dx, is_buy)
+            for pools in (amms, market):
+                split, iterations = multiple_market.solve_optimal_split(
+                    pools, i, dx, is_buy
+                )
+                assert iterations <= 10
+                assert_allclose(split, searched, rtol=1e-5)
+                # never worse than the ternary search: pays less or receives more
+                gain = quote(amms, i, dx, split) - quote(amms, i, dx, searched)
+                assert (-gain if is_buy else gain) >= -1e-9 * dx
+
+
+def test_multi_outcome_market_matches_amms():
+    for k in range(10):
+        amms, i, dx = multiple_market.generate_input(rng=k)
+        dx_i = dx / 3
+        market = multiple_market.MultiOutcomeMarket.from_amms(amms)
+        assert_array_equal(
+            market.buy_quote(i, dx, dx_i), multiple_market.buy_quote(amms, i, dx, dx_i)
+        )
+        assert_array_equal(
+            market.sell_quote(i, dx, dx_i),
+            multiple_market.sell_quote(amms, i, dx, dx_i),
+        )
+
+        pools = copy.deepcopy(amms)
+        assert_array_equal(
+            market.buy_multiple(i, dx, dx_i),
+            multiple_market.buy_multiple(pools, i, dx, dx_i),
+        )
+        assert_array_equal(
+            market.sell_multiple(i, dx / 2, dx_i / 2),
+            multiple_market.sell_multiple(pools, i, dx / 2, dx_i / 2),
+        )
+        assert_array_equal(market.X, [amm.X for amm in pools])
+        assert_array_equal(market.Y, [amm.Y for amm in pools])
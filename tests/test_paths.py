@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from numpy.testing import assert_array_equal
+
+from synstation.paths import PriceSeries
+
+
+def make_ticks(n=5_000, seed=0):
+    """
+    irregular ticks, 1 to 30 whole seconds apart
+    """
+    rng = np.random.default_rng(seed)
+    times = 1.7e9 + np.cumsum(rng.integers(1, 31, n)).astype(float)
+    prices = 3_000 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    return times, prices
+
+
+def previous_tick(times, prices, block_time, blocks):
+    block_times = times[0] + block_time * np.arange(blocks)
+    return prices[np.searchsorted(times, block_times, side="right") - 1]
+
+
+def test_resample_previous_tick(tmp_path):
+    times, prices = make_ticks()
+    np.save(tmp_path / "ticks.npy", np.c_[times, prices])
+    series = PriceSeries(str(tmp_path / "ticks.npy"), chunk_size=777)
+
+    chunks = list(series.resample(2, chunk_size=1_000))
+    assert max(len(chunk) for chunk in chunks) <= 1_000
+    resampled = np.concatenate(chunks)
+    assert len(resampled) == int((times[-1] - times[0]) // 2) + 1
+    assert_array_equal(resampled, previous_tick(times, prices, 2, len(resampled)))
+
+    # period stops the replay early
+    period = 0.5
+    resampled = np.concatenate(list(series.resample(2, period)))
+    assert len(resampled) == int(period * 86400 / 2)
+
+
+def test_from_csv(tmp_path):
+    times, prices = make_ticks(1_000)
+    path = tmp_path / "ticks.csv"
+    np.savetxt(
+        path,
+        np.c_[np.arange(len(times)), prices, times],
+        delimiter=",",
+        header="id,price,timestamp",
+        comments="",
+        fmt="%.17g",
+    )
+    series = PriceSeries.from_csv(str(path), chunk_size=300)
+    assert series.path == str(tmp_path / "ticks.npy")
+    assert_array_equal(np.load(series.path), np.c_[times, prices])
+
+
+def test_parquet_matches_npy(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    times, prices = make_ticks()
+    np.save(tmp_path / "ticks.npy", np.c_[times, prices])
+    expected = np.concatenate(
+        list(PriceSeries(str(tmp_path / "ticks.npy")).resample(2))
+    )
+
+    # numeric seconds and a timestamp column give the same series
+    stamps = pa.array((times * 1e9).astype(np.int64), pa.timestamp("ns"))
+    for column in (pa.array(times), stamps):
+        table = pa.table({"time": column, "close": prices})
+        pq.write_table(table, tmp_path / "ticks.parquet", row_group_size=1_000)
+        series = PriceSeries(
+            str(tmp_path / "ticks.parquet"),
+            time_column="time",
+            price_column="close",
+            chunk_size=700,
+        )
+        resampled = np.concatenate(list(series.resample(2)))
+        assert_array_equal(resampled, expected)
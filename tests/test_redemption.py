@@ -0,0 +1,42 @@
+import numpy as np
+from numpy.testing import assert_allclose
+
+from synstation import redemption
+
+# depegs below baseFee (nothing to redeem), above it, and capped by the reserve
+CASES = [
+    (250_000, 500_000, 0.998),
+    (250_000, 500_000, 0.99),
+    (250_000, 500_000, 0.98),
+    (1_000, 500_000, 0.98),
+]
+
+
+def test_closed_form_beats_ternary_search():
+    for reserve, totalSupply, price in CASES:
+        PSM = redemption.PegStabilityModule(reserve, totalSupply)
+        amount = redemption.get_optimal_redeem_amount(PSM, price)
+        searched = redemption.get_optimal_redeem_amount(PSM, price, "ternary")
+        assert 0 <= amount <= reserve
+        assert PSM.quoteRedemption(amount, price) >= PSM.quoteRedemption(
+            searched, price
+        )
+        assert redemption.get_optimal_redeem_amount(PSM, price, "verify") == amount
+
+    PSM = redemption.PegStabilityModule(250_000, 500_000)
+    assert redemption.get_optimal_redeem_amount(PSM, 0.998) == 0
+    assert_allclose(redemption.get_optimal_redeem_amount(PSM, 0.99), 2_500)
+    PSM = redemption.PegStabilityModule(1_000, 500_000)
+    assert redemption.get_optimal_redeem_amount(PSM, 0.98) == 1_000
+
+
+def test_batch_matches_scalar():
+    reserve, totalSupply, price = (np.array(case) for case in zip(*CASES))
+    PSMs = redemption.BatchPegStabilityModule(reserve, totalSupply)
+    expected = [
+        redemption.get_optimal_redeem_amount(
+            redemption.PegStabilityModule(*case[:2]), case[2]
+        )
+        for case in CASES
+    ]
+    assert_allclose(PSMs.get_optimal_redeem_amount(price), expected)
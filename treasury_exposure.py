@@ -0,0 +1,205 @@
+"""
+Distribution of the treasury payment over random outcome probabilities.
+
+For every number of outcomes N, many probability distributions are drawn
+from a symmetric Dirichlet(alpha) and priced with
+treasury_payment.get_treasury_payments_batch, chunk by chunk over a process pool.
+The percentiles of the expected and guaranteed payment are the basis
+of treasury budgets that hold in all but the tail.
+
+python treasury_exposure.py --outcomes 2 3 5 10 100 500 --samples 100000 --seed 1
+"""
+
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import tabulate
+
+import treasury_payment
+
+# Dirichlet draws with small alpha underflow to 0 (or round to 1),
+# which get_y_0_y_1 does not accept, so probabilities are kept inside (0, 1)
+P_MIN = np.finfo(float).tiny
+P_MAX = np.nextafter(1.0, 0.0)
+
+
+def sample_payments(n, B=1000, alpha=1.0, size=1000, rng=None):
+    """
+    expected and guaranteed treasury payments of size distributions
+    over n outcomes drawn from a symmetric Dirichlet(alpha)
+    """
+    assert n > 1
+    assert alpha > 0
+    rng = np.random.default_rng(rng)
+    p_array = np.clip(rng.dirichlet(np.full(n, alpha), size), P_MIN, P_MAX)
+    return treasury_payment.get_treasury_payments_batch(B, p_array)
+
+
+def chunk_sizes(samples, n, max_elements=2**20):
+    """
+    split samples into chunks of at most max_elements probabilities (n per sample)
+    """
+    rows = max(1, max_elements // n)
+    return [min(rows, samples - start) for start in range(0, samples, rows)]
+
+
+def _run_chunk(seed, n, B, alpha, size):
+    return sample_payments(n, B, alpha, size, np.random.default_rng(seed))
+
+
+def exposure_percentiles(
+    outcomes,  # numbers of outcomes N
+    B=1000,  # payment from proposer
+    alpha=1.0,  # Dirichlet concentration, 1: uniform over the simplex
+    samples=100_000,  # distributions drawn per N
+    percentiles=(50, 90, 99, 99.9),
+    seed=None,  # root seed, None draws fresh entropy
+    workers=None,  # number of processes, None: all cores, 1: run in this process
+    max_elements=2**20,  # probabilities per chunk, bounds the memory of a worker
+    progress=True,  # print progress while chunks come in
+):
+    """
+    mean and percentiles of the expected and guaranteed treasury payment per N.
+    every N has its own SeedSequence child, split again per chunk,
+    so the numbers depend on the seed and max_elements but not on workers.
+    chunks are submitted in N order with at most two per worker in flight,
+    so only the payments of the few N being sampled are held at once.
+    return {N: {"expected_mean", "expected", "guaranteed_mean", "guaranteed"}},
+    "expected" and "guaranteed" are arrays of the percentiles
+    """
+    outcomes = [int(n) for n in outcomes]
+    seeds = np.random.SeedSequence(seed).spawn(len(outcomes))
+
+    tasks = []
+    for n, seed_n in zip(outcomes, seeds):
+        sizes = chunk_sizes(samples, n, max_elements)
+        for start, size, seed_c in zip(
+            np.cumsum([0, *sizes[:-1]]), sizes, seed_n.spawn(len(sizes))
+        ):
+            tasks.append((n, int(start), size, seed_c))
+
+    results = {}
+    pending = {}
+
+    def collect(n, start, size, payments):
+        if n not in pending:
+            pending[n] = {"left": samples, "values": np.empty((2, samples))}
+        cell = pending[n]
+        cell["values"][:, start : start + size] = payments
+        cell["left"] -= size
+        if not cell["left"]:
+            expected, guaranteed = pending.pop(n)["values"]
+            results[n] = {
+                "expected_mean": expected.mean(),
+                "expected": np.percentile(expected, percentiles),
+                "guaranteed_mean": guaranteed.mean(),
+                "guaranteed": np.percentile(guaranteed, percentiles),
+            }
+
+    if workers == 1:
+        for done, (n, start, size, seed_c) in enumerate(tasks, start=1):
+            collect(n, start, size, _run_chunk(seed_c, n, B, alpha, size))
+            if progress:
+                print(f"\rSampling chunk {done}/{len(tasks)} ...", end="")
+    elif tasks:
+        window = 2 * (workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            queue = iter(tasks)
+            futures = {}
+            done = 0
+            while True:
+                for n, start, size, seed_c in queue:
+                    future = executor.submit(_run_chunk, seed_c, n, B, alpha, size)
+                    futures[future] = (n, start, size)
+                    if len(futures) >= window:
+                        break
+                if not futures:
+                    break
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    collect(*futures.pop(future), future.result())
+                    done += 1
+                    if progress:
+                        print(f"\rSampling chunk {done}/{len(tasks)} ...", end="")
+    if progress and tasks:
+        print()
+
+    return {n: results[n] for n in outcomes}
+
+
+def exposure_table(results, percentiles=(50, 90, 99, 99.9)):
+    """
+    one row per N: mean and percentiles of the expected, then of the guaranteed payment
+    """
+    headers = ["N", "Expected mean"]
+    headers += [f"Expected p{q:g}" for q in percentiles]
+    headers += ["Guaranteed mean"]
+    headers += [f"Guaranteed p{q:g}" for q in percentiles]
+
+    data = [
+        [
+            n,
+            result["expected_mean"],
+            *result["expected"],
+            result["guaranteed_mean"],
+            *result["guaranteed"],
+        ]
+        for n, result in results.items()
+    ]
+    return headers, data
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="percentiles of the treasury payment over Dirichlet distributions"
+    )
+    parser.add_argument(
+        "--outcomes",
+        type=int,
+        nargs="+",
+        default=[2, 3, 5, 10, 20, 50, 100, 200, 500],
+        help="numbers of outcomes N",
+    )
+    parser.add_argument("--B", type=float, default=1000, help="payment from proposer")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Dirichlet alpha")
+    parser.add_argument("--samples", type=int, default=100_000, help="draws per N")
+    parser.add_argument(
+        "--percentiles", type=float, nargs="+", default=[50, 90, 99, 99.9]
+    )
+    parser.add_argument("--seed", type=int, help="root seed")
+    parser.add_argument("--workers", type=int, help="number of processes")
+    parser.add_argument(
+        "--max-elements",
+        type=int,
+        default=2**20,
+        help="probabilities per chunk, bounds the memory of a worker",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    seed = args.seed
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    print(f"seed: {seed}")
+
+    results = exposure_percentiles(
+        args.outcomes,
+        args.B,
+        args.alpha,
+        args.samples,
+        args.percentiles,
+        seed,
+        args.workers,
+        args.max_elements,
+    )
+    headers, data = exposure_table(results, args.percentiles)
+    print(tabulate.tabulate(data, headers=headers, floatfmt=".2f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 def get_y_0_y_1(x_0, p_0):
@@ -70,6 +69,37 @@ def get_guaranteed_treasury_payment(B, p_array):
     return X * guaranteed_fund_share
 
 
+def get_treasury_payments_batch(B, p_array, mask=None):
+    """
+    get_expected_treasury_payment and get_guaranteed_treasury_payment
+    of many probability distributions in one array pass.
+    p_array: (..., outcomes) probabilities, one distribution per row,
+    rows with fewer outcomes padded to the same length
+    mask: (..., outcomes) True on the real outcomes, None if nothing is padded
+    B: payment from proposer, broadcast against the rows
+    return expected and guaranteed payments, arrays of shape p_array.shape[:-1]
+    """
+    p_array = np.asarray(p_array, dtype=float)
+    mask = np.ones(p_array.shape, dtype=bool) if mask is None else mask
+    mask = np.broadcast_to(mask, p_array.shape)
+    assert np.all(np.asarray(B) > 0)
+    assert np.all(((p_array > 0) & (p_array < 1)) | ~mask)
+
+    # get_y_0_y_1(1, p) of every outcome, padding replaced by a valid probability
+    sqrt_p = np.sqrt(np.where(mask, p_array, 0.5))
+    L = sqrt_p / (1 - sqrt_p)
+    y_0 = np.where(mask, L * sqrt_p, 0)
+    y_1 = L
+
+    expected_fund_share = np.sum(np.where(mask, y_1 * p_array, 0), axis=-1)
+    guaranteed_fund_share = np.min(np.where(mask, y_1, np.inf), axis=-1)
+    minted = 1 + np.sum(y_0, axis=-1)
+
+    expected = B / (minted - expected_fund_share) * expected_fund_share
+    guaranteed = B / (minted - guaranteed_fund_share) * guaranteed_fund_share
+    return expected, guaranteed
+
+
 def test_uniform_dist(n=2, B=1_000):
     """
     Test the result of the treasury payment calculation
@@ -83,12 +113,12 @@ def test_uniform_dist(n=2, B=1_000):
     print(f"min: {get_guaranteed_treasury_payment(B, q_array)}")
 
 
-def test_non_uniform_dist(n=2, B=1_000):
+def test_non_uniform_dist(n=2, B=1_000, rng=None):
     """
     Test the result of the treasury payment calculation
     under non-uniform distribution of outcomes.
     """
-    p_array = np.random.rand(n)
+    p_array = np.random.default_rng(rng).random(n)
     p_array = p_array / np.sum(p_array)
 
     print(f"{n}-outcomes distribution: {p_array}")
@@ -96,34 +126,62 @@ def test_non_uniform_dist(n=2, B=1_000):
     print(f"min: {get_guaranteed_treasury_payment(B, p_array)}")
 
 
-def plot_treasury_payment(max_N=10, B=1000):
+def get_treasury_payments(max_N=10, B=1000, rng=None):
     """
-    Plot the treasury payment for different number of outcomes.
-    We assume the probability distribution of outcomes is uniform.
+    Treasury payment for 2 ~ max_N outcomes, under a uniform distribution
+    and under a random non-uniform distribution for each number of outcomes.
+    rng: seed or np.random.Generator for the non-uniform distributions
+    return N, expected (uniform), expected (non-uniform), guaranteed (non-uniform)
     """
     assert max_N > 1
     assert B > 0
+    rng = np.random.default_rng(rng)
 
     N = np.arange(2, max_N + 1)
-    expected_payment_uniform = []
-    expected_payment_nonuniform = []
-    guaranteed_payment_nonuniform = []
+    # one row per number of outcomes, padded to max_N
+    mask = np.arange(max_N) < N[:, None]
+
+    # uniform probability distributions
+    p_array = np.where(mask, 1 / N[:, None], 0)
 
-    for n in N:
-        # generate uniform probability distribution
-        p_array = [1 / n for _ in range(n)]
+    # random probability distributions, drawn row by row
+    q_array = np.zeros(mask.shape)
+    q_array[mask] = rng.random(np.count_nonzero(mask))
+    q_array /= np.sum(q_array, axis=1, keepdims=True)
 
-        # generate random probability distribution
-        q_array = np.random.rand(n)
-        q_array = q_array / np.sum(q_array)
+    expected_payment_uniform, _ = get_treasury_payments_batch(B, p_array, mask)
+    expected_payment_nonuniform, guaranteed_payment_nonuniform = (
+        get_treasury_payments_batch(B, q_array, mask)
+    )
+
+    return (
+        N,
+        expected_payment_uniform,
+        expected_payment_nonuniform,
+        guaranteed_payment_nonuniform,
+    )
+
+
+def plot_treasury_payment(
+    max_N=10, B=1000, rng=None, path="plots/treasury_payment.png", show=True
+):
+    """
+    Plot the treasury payment for different number of outcomes.
+    We assume the probability distribution of outcomes is uniform.
+    rng: seed or np.random.Generator for the non-uniform distributions
+    path: where the figure is saved
+    show: open the figure in a window, otherwise close it after saving
+    """
+    import matplotlib.pyplot as plt
 
-        expected_payment_uniform.append(get_expected_treasury_payment(B, p_array))
-        expected_payment_nonuniform.append(get_expected_treasury_payment(B, q_array))
-        guaranteed_payment_nonuniform.append(
-            get_guaranteed_treasury_payment(B, q_array)
-        )
+    (
+        N,
+        expected_payment_uniform,
+        expected_payment_nonuniform,
+        guaranteed_payment_nonuniform,
+    ) = get_treasury_payments(max_N, B, rng)
 
-    plt.figure(figsize=(8, 6))
+    fig = plt.figure(figsize=(8, 6))
     plt.plot(N, expected_payment_uniform, label="In Expectation (Uniform)")
     plt.plot(N, expected_payment_nonuniform, label="In Expectation (Non-uniform)")
     plt.plot(N, guaranteed_payment_nonuniform, label="Guaranteed (Non-uniform)")
@@ -133,12 +191,14 @@ def plot_treasury_payment(max_N=10, B=1000):
     plt.xlabel("Number of Outcomes (N)")
     plt.ylabel("Treasury Payment")
     plt.legend()
-    plt.savefig("plots/treasury_payment.png")
-    plt.show()
+    plt.savefig(path)
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 
 if __name__ == "__main__":
-    np.random.seed(1337)
     print("seed: 1337")
 
-    plot_treasury_payment(10, 1000)
+    plot_treasury_payment(10, 1000, rng=1337)